@@ -3,11 +3,15 @@ GENIE Server - App Package
 
 This package initializes the FastMCP server and exports it for tool registration.
 """
-from mcp.server.fastmcp import FastMCP
-
 from app.config import settings
+from app.mcp_server import GenieMCP
 
-# Initialize the FastMCP server
-mcp = FastMCP(settings.SERVER_NAME)
+# Initialize the FastMCP server (instrumented with per-tool metrics)
+mcp = GenieMCP(
+    settings.SERVER_NAME,
+    port=settings.SERVER_PORT,
+    stateless_http=settings.HTTP_STATELESS,
+    json_response=settings.HTTP_JSON_RESPONSE
+)
 
 __all__ = ["mcp"]
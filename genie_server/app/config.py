@@ -7,6 +7,20 @@ import os
 from dataclasses import dataclass
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to a default."""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable ("1", "true", "yes" are truthy)."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class Settings:
     """Application settings with defaults."""
@@ -14,14 +28,86 @@ class Settings:
     # Server Configuration
     SERVER_NAME: str = "Genie-MCP-Server"
     SERVER_HOST: str = "localhost"
-    SERVER_PORT: int = 8000
+    SERVER_PORT: int = _env_int("SERVER_PORT", 8000)
+    # Worker processes behind the HTTP port; more than one requires stateless sessions
+    SERVER_WORKERS: int = _env_int("SERVER_WORKERS", 1)
+    # Stateless streamable-http: no session affinity, so any worker can serve any request
+    HTTP_STATELESS: bool = _env_bool("HTTP_STATELESS", _env_int("SERVER_WORKERS", 1) > 1)
+    # Answer tools/call with a single JSON response instead of an SSE stream,
+    # so large results can be compressed (SSE responses are never compressed).
+    # Progress and log notifications sent during a call are then dropped. On by
+    # default for stateless (multi-worker) deployments.
+    HTTP_JSON_RESPONSE: bool = _env_bool("HTTP_JSON_RESPONSE", HTTP_STATELESS)
+    # gzip (or brotli, if brotli-asgi is installed) for responses of at least this size (0 disables it)
+    HTTP_COMPRESSION_MIN_BYTES: int = _env_int("HTTP_COMPRESSION_MIN_BYTES", 1024)
     
     # MongoDB Configuration
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     MONGO_DEFAULT_DB: str = os.getenv("MONGO_DEFAULT_DB", "fitbit")
     
+    # MongoDB connection pool (a MONGO_MAX_POOL_SIZE of 0 leaves maxPoolSize to the driver default)
+    MONGO_MAX_POOL_SIZE: int = _env_int("MONGO_MAX_POOL_SIZE", 100)
+    MONGO_MIN_POOL_SIZE: int = _env_int("MONGO_MIN_POOL_SIZE", 0)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000)
+    # Comma-separated wire compressors in preference order, e.g. "zstd,snappy,zlib"
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "")
+    # Pre-open MONGO_MIN_POOL_SIZE connections when the HTTP server starts
+    MONGO_WARMUP: bool = _env_bool("MONGO_WARMUP", False)
+    
+    # Data tools
+    # Hard cap on documents returned per get_userData page or aggregate_data call
+    DATA_MAX_PAGE_SIZE: int = _env_int("DATA_MAX_PAGE_SIZE", 100)
+    # Server-side time limit for each get_userData query (0 disables it)
+    DATA_QUERY_MAX_TIME_MS: int = _env_int("DATA_QUERY_MAX_TIME_MS", 15000)
+    # Upper bound on aggregate_data's max_time_ms
+    DATA_AGGREGATE_MAX_TIME_MS: int = _env_int("DATA_AGGREGATE_MAX_TIME_MS", 30000)
+    # batch_get_data: specs per call and how many run at once
+    DATA_BATCH_MAX_SPECS: int = _env_int("DATA_BATCH_MAX_SPECS", 20)
+    DATA_BATCH_CONCURRENCY: int = _env_int("DATA_BATCH_CONCURRENCY", 8)
+    # Read cache, kept fresh by change streams (only active on replica sets)
+    DATA_CACHE_ENABLED: bool = _env_bool("DATA_CACHE_ENABLED", True)
+    DATA_CACHE_MAX_ENTRIES: int = _env_int("DATA_CACHE_MAX_ENTRIES", 1024)
+    DATA_CACHE_TTL_SECONDS: int = _env_int("DATA_CACHE_TTL_SECONDS", 300)
+    # Query-shape recorder: explains the hottest shapes every interval
+    DATA_PROFILER_ENABLED: bool = _env_bool("DATA_PROFILER_ENABLED", True)
+    DATA_PROFILER_MAX_SHAPES: int = _env_int("DATA_PROFILER_MAX_SHAPES", 500)
+    DATA_PROFILER_EXPLAIN_INTERVAL_SECONDS: int = _env_int("DATA_PROFILER_EXPLAIN_INTERVAL_SECONDS", 300)
+    DATA_PROFILER_EXPLAIN_TOP: int = _env_int("DATA_PROFILER_EXPLAIN_TOP", 5)
+    # Create the suggested indexes automatically instead of only reporting them
+    DATA_PROFILER_CREATE_INDEXES: bool = _env_bool("DATA_PROFILER_CREATE_INDEXES", False)
+    
+    # Tool executors (0 picks a default from the CPU count)
+    TOOL_THREAD_WORKERS: int = _env_int("TOOL_THREAD_WORKERS", 0)
+    TOOL_PROCESS_WORKERS: int = _env_int("TOOL_PROCESS_WORKERS", 0)
+    # Calls to size-gated offloaded tools with smaller text inputs stay on the event loop
+    TOOL_OFFLOAD_MIN_BYTES: int = _env_int("TOOL_OFFLOAD_MIN_BYTES", 16384)
+    # Time limit per test_regex call; the worker process of a call over it is killed (0 disables it)
+    TOOL_REGEX_TIMEOUT_MS: int = _env_int("TOOL_REGEX_TIMEOUT_MS", 5000)
+    # Default output-size budget per tool result; larger results are truncated (0 disables it)
+    TOOL_MAX_OUTPUT_BYTES: int = _env_int("TOOL_MAX_OUTPUT_BYTES", 1048576)
+    # Result cache per memoized tool (0 entries disables memoization)
+    TOOL_MEMO_MAX_ENTRIES: int = _env_int("TOOL_MEMO_MAX_ENTRIES", 256)
+    TOOL_MEMO_MAX_BYTES: int = _env_int("TOOL_MEMO_MAX_BYTES", 1048576)
+    # batch_call: calls per request and how many run at once
+    TOOL_BATCH_MAX_CALLS: int = _env_int("TOOL_BATCH_MAX_CALLS", 25)
+    TOOL_BATCH_CONCURRENCY: int = _env_int("TOOL_BATCH_CONCURRENCY", 8)
+    # Output-size budget for all results of one batch_call together (0 disables it)
+    TOOL_BATCH_MAX_OUTPUT_BYTES: int = _env_int("TOOL_BATCH_MAX_OUTPUT_BYTES", TOOL_MAX_OUTPUT_BYTES)
+    # Items per call of bulk tools such as parse_urls
+    TOOL_BULK_MAX_ITEMS: int = _env_int("TOOL_BULK_MAX_ITEMS", 50000)
+    # Directory that file_path arguments of text-scanning tools may read from ("" disables file input)
+    TOOL_FILE_ROOT: str = os.getenv("TOOL_FILE_ROOT", "")
+    # Streamed scans (file_path or chunks input): bytes read per chunk, and distinct results kept
+    TOOL_STREAM_CHUNK_BYTES: int = _env_int("TOOL_STREAM_CHUNK_BYTES", 4194304)
+    TOOL_STREAM_MAX_RESULTS: int = _env_int("TOOL_STREAM_MAX_RESULTS", 10000)
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "json" (one object per line) or "text"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # Share of info/debug lines kept per tool, e.g. "word_count=0.01,convert_length=0.1"
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
 
 
 # Global settings instance
@@ -1,4 +1,28 @@
 """Database package for GENIE Server."""
-from app.database.mongodb import get_database, get_collection, mongo_client
+from app.database.mongodb import (
+    get_mongo_client,
+    get_async_mongo_client,
+    get_database,
+    get_collection,
+    get_async_database,
+    get_async_collection,
+    warm_up_async_mongo_pool,
+)
+from app.database.cache import QueryCache, query_cache
+from app.database.operations import killable_operation
+from app.database.profiler import QueryShapeRecorder, query_recorder
 
-__all__ = ["get_database", "get_collection", "mongo_client"]
+__all__ = [
+    "get_mongo_client",
+    "get_async_mongo_client",
+    "get_database",
+    "get_collection",
+    "get_async_database",
+    "get_async_collection",
+    "warm_up_async_mongo_pool",
+    "QueryCache",
+    "query_cache",
+    "killable_operation",
+    "QueryShapeRecorder",
+    "query_recorder",
+]
@@ -0,0 +1,197 @@
+"""
+Query result cache for the MongoDB read tools.
+
+Results are kept in a bounded LRU with a TTL, keyed on a normalized form of
+the query. Freshness comes from MongoDB change streams: the first cached read
+on a collection starts a watcher, and every change event on that collection
+drops its entries. Results are only cached while the watcher is live, so on a
+standalone server (where change streams are unavailable) reads are never
+served stale; they simply bypass the cache.
+
+The cache is used from the server's event loop only and needs no locking.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from bson import json_util
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Server error code for "$changeStream is only supported on replica sets"
+_CHANGE_STREAM_UNSUPPORTED = 40573
+
+
+class QueryCache:
+    """
+    Bounded LRU/TTL cache of read results, invalidated by change streams.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_entries > 0
+        # key -> (expires_at, namespace, value); most recently used last
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._keys_by_namespace: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._watchers: Dict[str, asyncio.Task] = {}
+        self._live: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(namespace: str, query: Dict[str, Any], **params: Any) -> str:
+        """
+        Build a cache key from a namespace, a query filter and read options.
+        
+        Top-level filter fields are an implicit AND, so their order is
+        normalized away. Nested documents keep their order, since embedded
+        document equality in MongoDB is order-sensitive. Options must be
+        passed in an order-stable form (e.g. sort as a list of pairs).
+        """
+        normalized = {
+            "ns": namespace,
+            "q": [[field, query[field]] for field in sorted(query)],
+            "p": params,
+        }
+        return json_util.dumps(normalized, json_options=json_util.CANONICAL_JSON_OPTIONS)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return a cached value, or None on a miss or expired entry.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def begin(self, collection: AsyncCollection) -> Optional[int]:
+        """
+        Prepare to cache a read on a collection.
+        
+        Starts the collection's change-stream watcher if needed. Must be called
+        before the read is issued; the returned generation is passed to put()
+        so a result that raced with a change is discarded.
+        
+        Returns:
+            The namespace generation, or None if results cannot be cached yet.
+        """
+        if not self.enabled:
+            return None
+        namespace = collection.full_name
+        if namespace not in self._watchers:
+            self._watchers[namespace] = asyncio.get_running_loop().create_task(
+                self._watch(namespace, collection)
+            )
+        if namespace not in self._live:
+            return None
+        return self._generations.get(namespace, 0)
+    
+    def put(self, key: str, namespace: str, value: Any, generation: Optional[int]) -> None:
+        """
+        Store a value read at the given generation, evicting LRU entries.
+        """
+        if generation is None or namespace not in self._live:
+            return
+        if self._generations.get(namespace, 0) != generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, namespace, value)
+        self._entries.move_to_end(key)
+        self._keys_by_namespace.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def invalidate(self, namespace: str) -> None:
+        """
+        Drop every entry for a namespace and advance its generation.
+        """
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for key in self._keys_by_namespace.pop(namespace, ()):
+            self._entries.pop(key, None)
+        self.invalidations += 1
+    
+    def _remove(self, key: str) -> None:
+        """Remove one entry and its namespace index record."""
+        _, namespace, _ = self._entries.pop(key)
+        keys = self._keys_by_namespace.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache size and hit/miss/eviction counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "watched_collections": sorted(self._live),
+        }
+    
+    async def _watch(self, namespace: str, collection: AsyncCollection) -> None:
+        """
+        Invalidate a namespace on every change event, reconnecting on errors.
+        """
+        backoff = 1.0
+        while True:
+            try:
+                async with await collection.watch() as stream:
+                    self._live.add(namespace)
+                    backoff = 1.0
+                    async for _ in stream:
+                        self.invalidate(namespace)
+            except OperationFailure as e:
+                if e.code == _CHANGE_STREAM_UNSUPPORTED:
+                    logger.warning(
+                        f"Change streams unavailable for {namespace} (requires a replica set); "
+                        "results from this collection will not be cached"
+                    )
+                    self._live.discard(namespace)
+                    return
+                logger.warning(f"Change stream on {namespace} failed: {e}")
+            except PyMongoError as e:
+                logger.warning(f"Change stream on {namespace} failed: {e}")
+            
+            # Events may have been missed while the stream was down
+            self._live.discard(namespace)
+            self.invalidate(namespace)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+
+# Shared cache for the data tools
+query_cache = QueryCache(
+    max_entries=settings.DATA_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DATA_CACHE_TTL_SECONDS,
+    enabled=settings.DATA_CACHE_ENABLED
+)
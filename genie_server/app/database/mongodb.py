@@ -1,12 +1,21 @@
 """
 MongoDB connection and utility functions.
 
-Provides a singleton MongoDB client and helper functions for database access.
+Provides singleton MongoDB clients and helper functions for database access.
+The synchronous client serves blocking callers; the asynchronous client is used
+by tools running on the server's event loop so slow queries never stall it.
+
+Clients are created lazily on first use, so importing this module (and every
+tool module that depends on it) does not open any connections.
 """
+import asyncio
 import logging
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional
 
 import pymongo
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 from pymongo.collection import Collection
 
@@ -14,8 +23,31 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# MongoDB client singleton
+# MongoDB client singletons, guarded by _client_lock on creation
 _mongo_client: Optional[pymongo.MongoClient] = None
+_async_mongo_client: Optional[pymongo.AsyncMongoClient] = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> Dict[str, Any]:
+    """
+    Build the connection pool and compression options shared by both clients.
+    
+    Returns:
+        Dict of MongoClient keyword options derived from settings.
+    """
+    options: Dict[str, Any] = {
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    # pymongo reads maxPoolSize=0 as "no limit", so 0 is not passed through
+    if settings.MONGO_MAX_POOL_SIZE > 0:
+        options["maxPoolSize"] = settings.MONGO_MAX_POOL_SIZE
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS > 0:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
 
 
 def get_mongo_client() -> pymongo.MongoClient:
@@ -28,18 +60,66 @@ def get_mongo_client() -> pymongo.MongoClient:
     global _mongo_client
     
     if _mongo_client is None:
-        try:
-            _mongo_client = pymongo.MongoClient(settings.MONGO_URI)
-            logger.info(f"Connected to MongoDB at {settings.MONGO_URI}")
-        except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
-            raise
+        with _client_lock:
+            if _mongo_client is None:
+                try:
+                    _mongo_client = pymongo.MongoClient(settings.MONGO_URI, **_client_options())
+                    logger.info(f"Connected to MongoDB at {settings.MONGO_URI}")
+                except Exception as e:
+                    logger.error(f"Failed to connect to MongoDB: {e}")
+                    raise
     
     return _mongo_client
 
 
-# Convenience alias
-mongo_client = get_mongo_client()
+def get_async_mongo_client() -> pymongo.AsyncMongoClient:
+    """
+    Get or create the asynchronous MongoDB client singleton.
+    
+    The client does not connect until its first operation, which binds it to
+    the running event loop.
+    
+    Returns:
+        pymongo.AsyncMongoClient: The async MongoDB client instance.
+    """
+    global _async_mongo_client
+    
+    if _async_mongo_client is None:
+        with _client_lock:
+            if _async_mongo_client is None:
+                try:
+                    _async_mongo_client = pymongo.AsyncMongoClient(settings.MONGO_URI, **_client_options())
+                    logger.info(f"Created async MongoDB client for {settings.MONGO_URI}")
+                except Exception as e:
+                    logger.error(f"Failed to create async MongoDB client: {e}")
+                    raise
+    
+    return _async_mongo_client
+
+
+async def warm_up_async_mongo_pool() -> int:
+    """
+    Pre-open MONGO_MIN_POOL_SIZE connections on the asynchronous client.
+    
+    Concurrent pings force the pool to open one connection per ping instead
+    of reusing a single socket. Must run on the event loop that will serve
+    requests, since the async client binds to the loop of its first operation.
+    
+    Returns:
+        Number of successful pings.
+    """
+    count = max(settings.MONGO_MIN_POOL_SIZE, 1)
+    client = get_async_mongo_client()
+    results = await asyncio.gather(
+        *(client.admin.command("ping") for _ in range(count)),
+        return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        logger.warning(f"MongoDB pool warm-up failed for {len(errors)}/{count} connections: {errors[0]}")
+    else:
+        logger.info(f"Warmed up async MongoDB pool with {count} connections")
+    return count - len(errors)
 
 
 def get_database(db_name: Optional[str] = None) -> Database:
@@ -69,3 +149,32 @@ def get_collection(collection_name: str, db_name: Optional[str] = None) -> Colle
     """
     db = get_database(db_name)
     return db[collection_name]
+
+
+def get_async_database(db_name: Optional[str] = None) -> AsyncDatabase:
+    """
+    Get an async database instance.
+    
+    Args:
+        db_name: Database name. Defaults to MONGO_DEFAULT_DB from settings.
+        
+    Returns:
+        AsyncDatabase: The async MongoDB database instance.
+    """
+    client = get_async_mongo_client()
+    return client[db_name or settings.MONGO_DEFAULT_DB]
+
+
+def get_async_collection(collection_name: str, db_name: Optional[str] = None) -> AsyncCollection:
+    """
+    Get an async collection instance.
+    
+    Args:
+        collection_name: Name of the collection.
+        db_name: Database name. Defaults to MONGO_DEFAULT_DB from settings.
+        
+    Returns:
+        AsyncCollection: The async MongoDB collection instance.
+    """
+    db = get_async_database(db_name)
+    return db[collection_name]
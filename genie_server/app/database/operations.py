@@ -0,0 +1,88 @@
+"""
+Server-side cancellation for MongoDB operations started by tools.
+
+Cancelling the asyncio task that awaits a query only abandons the socket; the
+server keeps executing the operation until it finishes or hits maxTimeMS.
+Operations run inside killable_operation() are tagged with a unique comment,
+and when the task is cancelled (the MCP client sent notifications/cancelled or
+its session was torn down) the tagged operation is looked up with $currentOp
+and killed, along with any cursor it left open on the server.
+"""
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Set
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Kill tasks outlive the cancelled request; keep references so they are not collected
+_kill_tasks: Set[asyncio.Task] = set()
+
+# $currentOp may not list an operation that was sent just before cancellation yet
+_KILL_ATTEMPTS = 3
+_KILL_RETRY_DELAY = 0.05
+
+
+@asynccontextmanager
+async def killable_operation(client: pymongo.AsyncMongoClient, label: str) -> AsyncIterator[str]:
+    """
+    Tag a database operation so it can be killed if the calling task is cancelled.
+    
+    Args:
+        client: Client the operation runs on.
+        label: Short name of the caller, included in the comment for currentOp readers.
+        
+    Yields:
+        The comment to pass to find()/aggregate() as comment=.
+    """
+    comment = f"genie:{label}:{uuid.uuid4().hex}"
+    try:
+        yield comment
+    except asyncio.CancelledError:
+        task = asyncio.get_running_loop().create_task(_kill_by_comment(client, comment))
+        _kill_tasks.add(task)
+        task.add_done_callback(_kill_tasks.discard)
+        raise
+
+
+async def _find_operations(client: pymongo.AsyncMongoClient, comment: str) -> List[Dict[str, Any]]:
+    """List in-progress operations and idle cursors carrying a comment."""
+    pipeline = [
+        {"$currentOp": {"allUsers": True, "idleCursors": True}},
+        {"$match": {"$or": [
+            {"command.comment": comment},
+            {"cursor.originatingCommand.comment": comment},
+        ]}},
+    ]
+    cursor = await client.admin.aggregate(pipeline)
+    return await cursor.to_list()
+
+
+async def _kill_by_comment(client: pymongo.AsyncMongoClient, comment: str) -> None:
+    """
+    Kill the operation and open cursor tagged with a comment, if still running.
+    """
+    try:
+        for attempt in range(_KILL_ATTEMPTS):
+            operations = await _find_operations(client, comment)
+            if operations:
+                break
+            await asyncio.sleep(_KILL_RETRY_DELAY * (2 ** attempt))
+        else:
+            return
+        
+        for op in operations:
+            cursor = op.get("cursor") or {}
+            if op.get("type") == "idleCursor" and "cursorId" in cursor:
+                database, _, collection = op.get("ns", "").partition(".")
+                await client[database].command({"killCursors": collection, "cursors": [cursor["cursorId"]]})
+                logger.info(f"Killed idle cursor {cursor['cursorId']} for cancelled operation {comment}")
+            elif "opid" in op:
+                await client.admin.command({"killOp": 1, "op": op["opid"]})
+                logger.info(f"Killed operation {op['opid']} for cancelled operation {comment}")
+    except PyMongoError as e:
+        logger.warning(f"Failed to kill cancelled operation {comment}: {e}")
@@ -0,0 +1,205 @@
+"""
+Keyset pagination helpers for MongoDB reads.
+
+Pages are walked by remembering the sort-key values of the last document
+returned and filtering the next page to documents strictly after it. Unlike
+skip/offset paging, each page costs the same no matter how deep the walk goes,
+and only one page is ever held in memory.
+
+The continuation state is handed to clients as an opaque, URL-safe token that
+is bound to the query and sort it was issued for.
+"""
+import base64
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import Decimal128, ObjectId, Regex, Timestamp, json_util
+
+# Canonical Extended JSON keeps BSON types (ObjectId, dates, int vs double) intact
+_TOKEN_JSON_OPTIONS = json_util.CANONICAL_JSON_OPTIONS
+
+SortSpec = List[Tuple[str, int]]
+
+# MongoDB's sort order across BSON types, as (Python types, $type aliases);
+# null and missing fields sort first and compare equal
+_TYPE_ORDER: List[Tuple[Tuple[type, ...], List[str]]] = [
+    ((type(None),), ["null"]),
+    ((int, float, Decimal128), ["number"]),
+    ((str,), ["string", "symbol"]),
+    ((dict,), ["object"]),
+    ((), ["array"]),
+    ((bytes,), ["binData"]),
+    ((ObjectId,), ["objectId"]),
+    ((bool,), ["bool"]),
+    ((datetime,), ["date"]),
+    ((Timestamp,), ["timestamp"]),
+    ((Regex, re.Pattern), ["regex"]),
+]
+
+
+def normalize_sort(sort: Optional[Dict[str, int]] = None) -> SortSpec:
+    """
+    Turn a sort document into a list of (field, direction) pairs ending in _id.
+    
+    _id is appended as a unique tiebreaker so that every document has a
+    distinct position in the ordering, which keyset paging relies on.
+    
+    Args:
+        sort: Mapping of field name to 1 (ascending) or -1 (descending).
+        
+    Returns:
+        Ordered list of (field, direction) pairs.
+    """
+    spec: SortSpec = []
+    for field, direction in (sort or {}).items():
+        if direction not in (1, -1):
+            raise ValueError(f"Sort direction for '{field}' must be 1 or -1")
+        spec.append((field, direction))
+    if not any(field == "_id" for field, _ in spec):
+        spec.append(("_id", 1))
+    return spec
+
+
+def query_fingerprint(query: Dict[str, Any], sort: SortSpec) -> str:
+    """
+    Compute a short fingerprint identifying a (query, sort) combination.
+    """
+    canonical = json_util.dumps({"q": query, "s": sort}, sort_keys=True, json_options=_TOKEN_JSON_OPTIONS)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_page_token(fingerprint: str, values: List[Any]) -> str:
+    """
+    Encode the last sort-key values of a page into an opaque continuation token.
+    """
+    payload = json_util.dumps({"f": fingerprint, "v": values}, json_options=_TOKEN_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str, fingerprint: str) -> List[Any]:
+    """
+    Decode a continuation token issued for the same query and sort.
+    
+    Args:
+        token: Token from a previous page.
+        fingerprint: Fingerprint of the current (query, sort).
+        
+    Returns:
+        The sort-key values of the last document of the previous page.
+        
+    Raises:
+        ValueError: If the token is malformed or was issued for another query.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded), json_options=_TOKEN_JSON_OPTIONS)
+        token_fingerprint, values = payload["f"], payload["v"]
+    except Exception:
+        raise ValueError("Invalid page_token")
+    if token_fingerprint != fingerprint:
+        raise ValueError("page_token does not match this query and sort")
+    return values
+
+
+def _type_rank(field: str, value: Any) -> int:
+    """
+    Position of a sort-key value's type in MongoDB's cross-type sort order.
+    
+    Raises:
+        ValueError: For arrays, whose sort key is one of their elements, and
+            types that cannot be paged over.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (list, tuple)):
+        raise ValueError(f"Cannot page over sort field '{field}': it holds an array")
+    if isinstance(value, bool):
+        # bool is a subclass of int, but sorts after every number
+        return next(rank for rank, (types, _) in enumerate(_TYPE_ORDER) if bool in types)
+    for rank, (types, _) in enumerate(_TYPE_ORDER):
+        if isinstance(value, types):
+            return rank
+    raise ValueError(f"Cannot page over sort field '{field}': unsupported value type {type(value).__name__}")
+
+
+def sort_values(doc: Dict[str, Any], sort: SortSpec) -> List[Any]:
+    """
+    Extract the sort-key values of a document (dotted paths are followed).
+    
+    A missing field is returned as None, which MongoDB sorts the same as null.
+    
+    Raises:
+        ValueError: If a value cannot be paged over, see _type_rank().
+    """
+    values = []
+    for field, _ in sort:
+        value: Any = doc
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        _type_rank(field, value)
+        values.append(value)
+    return values
+
+
+def _after(field: str, direction: int, value: Any) -> List[Dict[str, Any]]:
+    """
+    Alternative conditions for field values that sort strictly after value.
+    
+    $gt and $lt only compare values of the same type, so the values of the
+    types sorted after value's type (before it, for descending fields) are
+    matched by type instead.
+    """
+    rank = _type_rank(field, value)
+    if direction == 1:
+        alternatives = [{field: {"$gt": value}}] if value is not None else []
+        later = [alias for _, aliases in _TYPE_ORDER[rank + 1:] for alias in aliases]
+        if later:
+            alternatives.append({field: {"$type": later}})
+        return alternatives
+    alternatives = [{field: {"$lt": value}}] if value is not None else []
+    earlier = [alias for _, aliases in _TYPE_ORDER[1:rank] for alias in aliases]
+    if earlier:
+        alternatives.append({field: {"$type": earlier}})
+    if value is not None:
+        # Null sorts first; {field: None} also matches documents without the field
+        alternatives.append({field: None})
+    return alternatives
+
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> Dict[str, Any]:
+    """
+    Build a filter matching documents that sort strictly after the given key.
+    
+    For a sort on (a, b, _id) this yields
+    {a > va} OR {a = va, b > vb} OR {a = va, b = vb, _id > vid},
+    with > replaced by < for descending fields. "a > va" also covers
+    documents whose a is of a type sorted after va's, and null or missing
+    values (see _after()).
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        alternatives = _after(field, direction, values[i])
+        if not alternatives:
+            continue
+        clause: Dict[str, Any] = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        if len(alternatives) == 1:
+            clause.update(alternatives[0])
+        else:
+            clause["$or"] = alternatives
+        clauses.append(clause)
+    if not clauses:
+        # Nothing sorts after this key
+        return {"_id": {"$exists": False}}
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def apply_keyset(query: Dict[str, Any], sort: SortSpec, values: Optional[List[Any]]) -> Dict[str, Any]:
+    """
+    Combine a user query with the keyset condition for the next page.
+    """
+    if values is None:
+        return query
+    after = keyset_filter(sort, values)
+    return {"$and": [query, after]} if query else after
@@ -0,0 +1,294 @@
+"""
+Query-shape recorder and index advisor for the MongoDB read tools.
+
+Every database read is recorded under its query shape: the filter with all
+literal values replaced by "?", plus the sort. Shapes aggregate call counts and
+latency. In the background, the hottest shapes are periodically explained
+(queryPlanner verbosity only, so nothing is executed) to spot collection scans
+and in-memory sorts, and a supporting index is proposed for each following the
+equality-sort-range (ESR) rule. Index creation is opt-in.
+
+The recorder is used from the server's event loop only and needs no locking.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Logical operators whose list operands are sub-filters rather than values
+_LOGICAL_OPERATORS = {"$and", "$or", "$nor"}
+# Operators an index can serve as an exact match (ESR "equality")
+_EQUALITY_OPERATORS = {"$eq", "$in"}
+
+IndexSpec = List[Tuple[str, int]]
+
+
+def query_shape(query: Any) -> Any:
+    """
+    Replace every literal value in a filter with "?", keeping fields and operators.
+    
+    {"age": {"$gt": 30}, "name": "Ann"} becomes {"age": {"$gt": "?"}, "name": "?"}.
+    """
+    if not isinstance(query, dict):
+        return "?"
+    shaped = {}
+    for key, value in query.items():
+        if str(key).startswith("$"):
+            shaped[key] = _operand_shape(key, value)
+        elif isinstance(value, dict) and value and all(str(op).startswith("$") for op in value):
+            shaped[key] = query_shape(value)
+        else:
+            # Literal values, including embedded documents matched as a whole
+            shaped[key] = "?"
+    return shaped
+
+
+def _operand_shape(operator: str, value: Any) -> Any:
+    """Shape the operand of a query operator."""
+    if operator in _LOGICAL_OPERATORS and isinstance(value, list):
+        return [query_shape(clause) for clause in value]
+    if isinstance(value, dict):
+        return query_shape(value)
+    return "?"
+
+
+def _merge_conditions(query: Dict[str, Any], equality: List[str], ranges: List[str]) -> bool:
+    """
+    Sort the top-level fields of a filter into equality and range predicates.
+    
+    Returns:
+        False if the filter uses operators a single compound index cannot serve
+        ($or, $nor, $expr, $text, ...).
+    """
+    for name, condition in query.items():
+        if name == "$and" and isinstance(condition, list):
+            for clause in condition:
+                if not isinstance(clause, dict) or not _merge_conditions(clause, equality, ranges):
+                    return False
+        elif name.startswith("$"):
+            return False
+        elif isinstance(condition, dict) and condition and all(str(op).startswith("$") for op in condition):
+            target = equality if set(condition) <= _EQUALITY_OPERATORS and len(condition) == 1 else ranges
+            target.append(name)
+        else:
+            equality.append(name)
+    return True
+
+
+def suggest_index(query: Dict[str, Any], sort: IndexSpec) -> Optional[IndexSpec]:
+    """
+    Propose a compound index for a filter and sort using the ESR rule.
+    
+    Equality fields come first, then the sort fields in order, then range
+    fields, so the index both narrows the scan and returns documents already
+    sorted.
+    
+    Returns:
+        Index key list, or None if no single index beyond _id would help.
+    """
+    equality: List[str] = []
+    ranges: List[str] = []
+    if not _merge_conditions(query, equality, ranges):
+        return None
+    keys: IndexSpec = []
+    seen: Set[str] = set()
+    for name, direction in [(f, 1) for f in equality] + list(sort) + [(f, 1) for f in ranges]:
+        if name not in seen:
+            seen.add(name)
+            keys.append((name, direction))
+    if not keys or keys[0][0] == "_id":
+        return None
+    return keys
+
+
+def _plan_summary(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize the winning plan of an explain() result.
+    """
+    stages: List[str] = []
+    indexes: List[str] = []
+    
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            if isinstance(node.get("indexName"), str) and node["indexName"] not in indexes:
+                indexes.append(node["indexName"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+    
+    walk(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+@dataclass
+class ShapeStats:
+    """Aggregated statistics for one query shape."""
+    
+    namespace: str
+    shape: Any
+    sort: IndexSpec
+    # Most recent concrete filter, used to explain the shape
+    sample: Dict[str, Any]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    total_docs: int = 0
+    plan: Optional[Dict[str, Any]] = None
+    suggested_index: Optional[IndexSpec] = None
+    index_created: bool = False
+    
+    def report(self) -> Dict[str, Any]:
+        """JSON-friendly view of the statistics."""
+        return {
+            "collection": self.namespace,
+            "shape": self.shape,
+            "sort": [list(pair) for pair in self.sort],
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "avg_docs": round(self.total_docs / self.count, 2) if self.count else 0.0,
+            "plan": self.plan,
+            "suggested_index": [list(pair) for pair in self.suggested_index] if self.suggested_index else None,
+            "index_created": self.index_created,
+        }
+
+
+class QueryShapeRecorder:
+    """
+    Records query shapes with their latency and explains the hottest ones.
+    """
+    
+    def __init__(
+        self,
+        max_shapes: int,
+        explain_interval_seconds: float,
+        explain_top: int,
+        create_indexes: bool = False,
+        enabled: bool = True
+    ):
+        self.max_shapes = max_shapes
+        self.explain_interval_seconds = explain_interval_seconds
+        self.explain_top = explain_top
+        self.create_indexes = create_indexes
+        self.enabled = enabled and max_shapes > 0
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._collections: Dict[str, AsyncCollection] = {}
+        self._analysis: Optional[asyncio.Task] = None
+        self._last_analysis = time.monotonic()
+        self.dropped = 0
+    
+    def record(
+        self,
+        collection: AsyncCollection,
+        query: Dict[str, Any],
+        sort: IndexSpec,
+        elapsed_ms: float,
+        documents: int
+    ) -> None:
+        """
+        Record one executed read and schedule an analysis pass when one is due.
+        """
+        if not self.enabled:
+            return
+        namespace = collection.full_name
+        shape = query_shape(query)
+        key = json.dumps([namespace, shape, sort], sort_keys=True)
+        stats = self._shapes.get(key)
+        if stats is None:
+            if len(self._shapes) >= self.max_shapes:
+                self.dropped += 1
+                return
+            stats = self._shapes[key] = ShapeStats(namespace, shape, list(sort), query)
+        stats.sample = query
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.total_docs += documents
+        self._collections[namespace] = collection
+        
+        due = time.monotonic() - self._last_analysis >= self.explain_interval_seconds
+        if due and (self._analysis is None or self._analysis.done()):
+            self._last_analysis = time.monotonic()
+            self._analysis = asyncio.get_running_loop().create_task(self.analyze())
+    
+    def hottest(self, top: int) -> List[ShapeStats]:
+        """Return the shapes with the highest total time spent."""
+        return sorted(self._shapes.values(), key=lambda s: s.total_ms, reverse=True)[:top]
+    
+    async def analyze(self, top: Optional[int] = None) -> None:
+        """
+        Explain the hottest shapes and refresh their plan and index suggestion.
+        """
+        for stats in self.hottest(top or self.explain_top):
+            collection = self._collections[stats.namespace]
+            command: Dict[str, Any] = {"find": collection.name, "filter": stats.sample}
+            if stats.sort:
+                command["sort"] = dict(stats.sort)
+            try:
+                explain = await collection.database.command(
+                    {"explain": command, "verbosity": "queryPlanner"}
+                )
+            except PyMongoError as e:
+                logger.warning(f"explain() failed for {stats.namespace} shape {stats.shape}: {e}")
+                stats.plan = {"error": str(e)}
+                continue
+            
+            stats.plan = _plan_summary(explain)
+            stats.plan["explained_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            needs_index = stats.plan["collscan"] or stats.plan["in_memory_sort"]
+            stats.suggested_index = suggest_index(stats.sample, stats.sort) if needs_index else None
+            if stats.suggested_index and stats.plan["collscan"]:
+                logger.warning(
+                    f"COLLSCAN on {stats.namespace} for shape "
+                    f"{json.dumps(stats.shape)}; suggested index {stats.suggested_index}"
+                )
+            
+            if stats.suggested_index and self.create_indexes and not stats.index_created:
+                try:
+                    name = await collection.create_index(stats.suggested_index)
+                    stats.index_created = True
+                    logger.info(f"Created index {name} on {stats.namespace}")
+                except PyMongoError as e:
+                    logger.warning(f"Failed to create index on {stats.namespace}: {e}")
+    
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Report the hottest query shapes with their latest plan analysis.
+        """
+        return {
+            "enabled": self.enabled,
+            "shapes_tracked": len(self._shapes),
+            "shapes_dropped": self.dropped,
+            "create_indexes": self.create_indexes,
+            "shapes": [stats.report() for stats in self.hottest(top)],
+        }
+
+
+# Shared recorder for the data tools
+query_recorder = QueryShapeRecorder(
+    max_shapes=settings.DATA_PROFILER_MAX_SHAPES,
+    explain_interval_seconds=settings.DATA_PROFILER_EXPLAIN_INTERVAL_SECONDS,
+    explain_top=settings.DATA_PROFILER_EXPLAIN_TOP,
+    create_indexes=settings.DATA_PROFILER_CREATE_INDEXES,
+    enabled=settings.DATA_PROFILER_ENABLED
+)
@@ -0,0 +1,299 @@
+"""
+Execution layer for MCP tools.
+
+FastMCP runs synchronous tools inline on the event loop, so one expensive call
+stalls every session. Each tool is registered with an execution class:
+
+- "inline": run on the event loop (cheap tools, and async tools).
+- "thread": run in a shared thread pool (work that releases the GIL, such as
+  hashing large inputs).
+- "process": run in a shared process pool (pure-Python CPU work, which only
+  scales across cores in separate processes).
+
+Offloaded tools get a per-tool concurrency limit so one tool cannot take over
+a whole pool, and small calls can stay inline where the hand-off would cost
+more than the work itself. Queue depth and in-flight calls are exported as
+metrics.
+
+A process tool can also have a per-call timeout. Its calls then run in
+single-worker pools of its own, one per concurrency slot: a call over the
+timeout has its worker process killed, which the shared pool could not do
+without failing every other call in it.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_CLASSES = ("inline", "thread", "process")
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def thread_pool_size() -> int:
+    """Worker count of the shared thread pool."""
+    return settings.TOOL_THREAD_WORKERS or min(32, (os.cpu_count() or 1) + 4)
+
+
+def process_pool_size() -> int:
+    """Worker count of the shared process pool."""
+    return settings.TOOL_PROCESS_WORKERS or os.cpu_count() or 1
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Get or create the shared thread pool."""
+    global _thread_pool
+    
+    if _thread_pool is None:
+        with _pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(thread_pool_size(), thread_name_prefix="genie-tool")
+    return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get or create the shared process pool.
+    
+    Workers are spawned rather than forked: forking a process that already runs
+    an event loop, database client threads and a thread pool is unsafe.
+    """
+    global _process_pool
+    
+    if _process_pool is None:
+        with _pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    process_pool_size(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken process pool so the next call starts a fresh one."""
+    global _process_pool
+    
+    with _pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _kill_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop a process pool's workers, even in the middle of a call."""
+    # The executor has no public way to stop a busy worker
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pools() -> None:
+    """Shut down the shared pools and the timed tools' workers (used on server shutdown)."""
+    global _thread_pool, _process_pool
+    
+    with _pool_lock:
+        pools = [p for p in (_thread_pool, _process_pool) if p is not None]
+        _thread_pool = _process_pool = None
+    for state in _offloaded.values():
+        pools += state.workers
+        state.workers.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _value_bytes(value: Any) -> int:
+    """Total length of the strings and bytes in a value, including inside lists and dicts."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, list):
+        return sum(_value_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_value_bytes(item) for item in value.values())
+    return 0
+
+
+def _argument_bytes(args: tuple, kwargs: Dict[str, Any]) -> int:
+    """Approximate payload size of a call from the strings and bytes in its arguments."""
+    return sum(_value_bytes(value) for value in (*args, *kwargs.values()))
+
+
+class OffloadedTool:
+    """
+    Concurrency limit and queue statistics for one offloaded tool.
+    """
+    
+    def __init__(self, name: str, execution: str, max_concurrency: int, min_offload_bytes: int,
+                 offload_args: Tuple[str, ...] = (),
+                 offload_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 timeout_ms: int = 0):
+        self.name = name
+        self.execution = execution
+        self.max_concurrency = max_concurrency
+        self.min_offload_bytes = min_offload_bytes
+        self.offload_args = offload_args
+        self.offload_if = offload_if
+        self.timeout_ms = timeout_ms
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Idle single-worker pools of a process tool with a timeout
+        self.workers: List[ProcessPoolExecutor] = []
+        self.waiting = 0
+        self.running = 0
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.timeouts = 0
+    
+    def _runs_inline(self, args: tuple, kwargs: Dict[str, Any]) -> bool:
+        """Whether a call is small enough to run on the event loop."""
+        return bool(
+            self.min_offload_bytes
+            and not any(kwargs.get(arg) is not None for arg in self.offload_args)
+            and _argument_bytes(args, kwargs) < self.min_offload_bytes
+            and not (self.offload_if and self.offload_if(kwargs))
+        )
+    
+    async def run(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Run one call in the tool's executor, waiting for a free slot first."""
+        if self._runs_inline(args, kwargs):
+            self.inline_calls += 1
+            return fn(*args, **kwargs)
+        
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        self.offloaded_calls += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            if self.execution == "thread":
+                return await loop.run_in_executor(get_thread_pool(), call)
+            if self.timeout_ms:
+                return await self._run_timed(call)
+            pool = get_process_pool()
+            try:
+                return await loop.run_in_executor(pool, call)
+            except BrokenProcessPool:
+                logger.error(f"Process pool broke while running {self.name}; restarting it")
+                _discard_process_pool(pool)
+                raise
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+    
+    async def _run_timed(self, call: Callable[[], Any]) -> Any:
+        """
+        Run a call in one of the tool's own worker processes, killing it on timeout.
+        
+        Raises:
+            TimeoutError: If the call took longer than timeout_ms.
+        """
+        # The semaphore guarantees a free worker or room for a new one
+        worker = self.workers.pop() if self.workers else ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context("spawn")
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(loop.run_in_executor(worker, call), self.timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"{self.name} exceeded {self.timeout_ms} ms; stopping its worker process")
+            _kill_process_pool(worker)
+            raise TimeoutError(f"{self.name} took longer than {self.timeout_ms} ms and was stopped")
+        except BaseException:
+            # A broken or cancelled worker is not reused
+            _kill_process_pool(worker)
+            raise
+        self.workers.append(worker)
+        return result
+
+
+# Offloaded tools by name, for metrics
+_offloaded: Dict[str, OffloadedTool] = {}
+
+
+def offload(fn: Callable[..., Any], name: str, execution: str, max_concurrency: Optional[int] = None,
+            min_offload_bytes: int = 0, offload_args: Tuple[str, ...] = (),
+            offload_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+            timeout_ms: int = 0) -> Callable[..., Any]:
+    """
+    Wrap a synchronous tool so it runs in the thread or process pool.
+    
+    The wrapper keeps the tool's name, signature and docstring, so FastMCP
+    derives the same schema from it. For the process pool, the original function
+    must stay importable under its module-level name so it can be pickled.
+    
+    Args:
+        fn: The synchronous tool function.
+        name: Tool name, used in metrics.
+        execution: "thread" or "process".
+        max_concurrency: Calls of this tool allowed in the pool at once.
+            Defaults to the pool size.
+        min_offload_bytes: Calls whose string arguments total fewer bytes run
+            inline instead. 0 always offloads.
+        offload_args: Arguments that make a call offloaded whatever its size
+            when given, e.g. a file path to read.
+        offload_if: Called with a small call's arguments; True offloads it
+            anyway, e.g. when its run time does not follow its size.
+        timeout_ms: Time limit per call for process tools; the worker of a
+            call over it is killed. 0 means no limit.
+            
+    Returns:
+        An async function to register with FastMCP.
+    """
+    if execution not in ("thread", "process"):
+        raise ValueError(f"Cannot offload tool {name} with execution={execution!r}")
+    if asyncio.iscoroutinefunction(fn):
+        raise ValueError(f"Tool {name} is async; only synchronous tools can be offloaded")
+    if timeout_ms and execution != "process":
+        raise ValueError(f"Tool {name}: only process tools can have a timeout")
+    
+    default_limit = thread_pool_size() if execution == "thread" else process_pool_size()
+    state = OffloadedTool(name, execution, max(1, max_concurrency or default_limit), min_offload_bytes,
+                          offload_args, offload_if, timeout_ms)
+    _offloaded[name] = state
+    
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await state.run(fn, args, kwargs)
+    
+    return wrapper
+
+
+def _collect_metrics() -> Iterable[str]:
+    """Prometheus lines for offloaded tool queues."""
+    tools = sorted(_offloaded.items())
+    series = (
+        ("genie_tool_queue_depth", "gauge", "Calls waiting for a concurrency slot.", "waiting"),
+        ("genie_tool_in_flight", "gauge", "Calls running in an executor.", "running"),
+        ("genie_tool_max_concurrency", "gauge", "Per-tool executor concurrency limit.", "max_concurrency"),
+        ("genie_tool_inline_calls_total", "counter", "Calls kept inline because their input was small.",
+         "inline_calls"),
+        ("genie_tool_offloaded_calls_total", "counter", "Calls run in an executor.", "offloaded_calls"),
+        ("genie_tool_timeouts_total", "counter", "Calls stopped for exceeding the tool's timeout.", "timeouts"),
+    )
+    lines: List[str] = []
+    for metric, kind, help_text, attribute in series:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, state in tools:
+            lines.append(
+                f'{metric}{{tool="{name}",execution="{state.execution}"}} {getattr(state, attribute)}'
+            )
+    return lines
+
+
+metrics.register_collector(_collect_metrics)
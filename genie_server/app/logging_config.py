@@ -0,0 +1,149 @@
+"""
+Logging setup for GENIE Server.
+
+Log calls only put the record on an in-memory queue; a background listener
+thread formats the records and writes them to stdout. A slow or blocked
+stdout then no longer stalls the event loop.
+
+Each tool call runs with a trace id and the tool name in context variables.
+Every record logged while it runs carries both, so all lines of one request
+can be correlated. batch_call's inner calls share the batch's trace id.
+For high-volume tools, LOG_SAMPLE_RATES keeps only a share of their
+below-warning records. Sampling is decided per trace id, so a sampled request
+keeps all of its lines.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Trace id and tool name of the tool call being handled
+trace_id_var: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+tool_var: ContextVar[Optional[str]] = ContextVar("tool", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s"
+
+# Attributes every LogRecord has (plus uvicorn's ANSI-colored duplicate of the
+# message); anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message", "asctime", "trace_id", "tool", "color_message"
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_trace_id() -> str:
+    """Generate a trace id for one request."""
+    return uuid.uuid4().hex[:16]
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse "tool=rate,tool=rate" into a rate map, e.g. "word_count=0.01".
+    
+    Raises:
+        ValueError: If a rate is not a number between 0 and 1.
+    """
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.strip().partition("=")
+        if not name:
+            continue
+        value = float(rate)
+        if not 0 <= value <= 1:
+            raise ValueError(f"Log sample rate for {name} must be between 0 and 1, got {rate}")
+        rates[name] = value
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current trace id and tool name to each record."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get() or "-"
+        record.tool = tool_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a share of the below-warning records logged by high-volume tools.
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, "tool", None))
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        trace_id = getattr(record, "trace_id", "-")
+        if trace_id == "-":
+            return rate > 0
+        # The same trace id always gets the same decision
+        return int(trace_id[:8], 16) / 0xFFFFFFFF < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+        }
+        if getattr(record, "tool", None):
+            entry["tool"] = record.tool
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level: str = "INFO", log_format: str = "json", sample_rates: str = "") -> None:
+    """
+    Route all logging through a queue to a background stdout writer.
+    
+    Replaces any handlers already on the root logger (such as the one FastMCP
+    installs), so it may be called after the server is created.
+    
+    Args:
+        level: Root log level.
+        log_format: "json" for one JSON object per line, "text" for plain lines.
+        sample_rates: Per-tool sampling as "tool=rate,...", see parse_sample_rates().
+    """
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+    
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    
+    # Filters run in the logging thread, where the context variables are set
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    rates = parse_sample_rates(sample_rates)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+    
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(_listener.stop)
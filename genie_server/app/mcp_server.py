@@ -0,0 +1,218 @@
+"""
+FastMCP server subclass with GENIE's tool-call instrumentation.
+
+Every tool call, whatever module registered the tool, is dispatched through
+FastMCP.call_tool(); overriding it here records per-tool metrics without
+touching the tool functions themselves. Tool registration additionally takes
+an execution class (see app.execution) and an output-size budget (see
+app.utils.budget).
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.fastmcp.tools import Tool
+from mcp.types import CallToolResult, TextContent
+
+from app.config import settings
+from app.execution import EXECUTION_CLASSES, offload
+from app.logging_config import new_trace_id, tool_var, trace_id_var
+from app.utils.budget import TRUNCATION_KEYS, apply_output_budget, json_size, to_json
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _convert_result(tool: Tool, result: Any, serialized: Optional[bytes],
+                    untrimmed: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Convert a tool result to MCP content, as FastMCP's convert_result() does.
+    
+    FastMCP serializes dict results again, indented, for the text content;
+    here the compact JSON already produced for the size check is reused.
+    
+    The truncation metadata of a trimmed result is not part of the tool's
+    output schema (a Dict[str, str] result cannot hold it), so it goes into
+    the result's _meta instead of its structured content; the text content
+    keeps it. Fields of the same name that the tool returns itself, such as
+    aggregate_data's "truncated", stay in the structured content.
+    
+    Args:
+        untrimmed: The result before apply_output_budget() trimmed it, if it did.
+    """
+    metadata = tool.fn_metadata
+    if not isinstance(result, dict) or serialized is None:
+        return metadata.convert_result(result)
+    content = [TextContent(type="text", text=serialized.decode())]
+    if metadata.output_schema is None:
+        return content
+    meta = None
+    if untrimmed is not None:
+        meta = {key: result[key] for key in TRUNCATION_KEYS}
+        result = {key: value for key, value in result.items() if key not in meta or key in untrimmed}
+    structured = metadata.output_model.model_validate({"result": result} if metadata.wrap_output else result)
+    structured_content = structured.model_dump(mode="json", by_alias=True)
+    if meta is None:
+        return content, structured_content
+    # Returned as is, without the server's check against the output schema
+    return CallToolResult(content=content, structuredContent=structured_content, _meta=meta)
+
+
+class GenieMCP(FastMCP):
+    """
+    FastMCP server that records call count, errors, latency and payload sizes per tool.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Tool name -> output-size budget in bytes (0 disables it)
+        self._output_budgets: Dict[str, int] = {}
+        # Tools whose over-budget results are replaced by an error instead of trimmed
+        self._untruncatable_tools: Set[str] = set()
+        # Tools that must not run concurrently with other calls in a batch
+        self._serial_tools: Set[str] = set()
+    
+    def tool(
+        self,
+        name: Optional[str] = None,
+        *,
+        execution: str = "inline",
+        max_concurrency: Optional[int] = None,
+        min_offload_bytes: int = 0,
+        offload_args: Tuple[str, ...] = (),
+        offload_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        timeout_ms: int = 0,
+        max_output_bytes: Optional[int] = None,
+        truncate: bool = True,
+        parallel: bool = True,
+        **kwargs: Any
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator to register a tool, optionally offloaded to an executor.
+        
+        Args:
+            name: Tool name. Defaults to the function name.
+            execution: "inline" (event loop), "thread" or "process" pool.
+            max_concurrency: Calls of this tool allowed in the pool at once.
+            min_offload_bytes: Run calls with smaller string arguments inline.
+            offload_args: Arguments that always offload the call when given.
+            offload_if: Offloads a small call anyway when it returns True for its arguments.
+            timeout_ms: Per-call time limit of a process tool (0 disables it).
+            max_output_bytes: Output-size budget; larger results are truncated.
+                Defaults to TOOL_MAX_OUTPUT_BYTES, 0 disables it.
+            truncate: Whether an over-budget result may be trimmed. Leave False
+                for results that are useless cut short, such as encoded text;
+                the call then returns an error asking for a smaller input.
+            parallel: Whether batch_call may run this tool concurrently with others.
+            **kwargs: Passed through to FastMCP.tool().
+            
+        Returns:
+            A decorator that registers the function and returns it unchanged.
+        """
+        if callable(name):
+            return super().tool(name)
+        if execution not in EXECUTION_CLASSES:
+            raise ValueError(f"execution must be one of {', '.join(EXECUTION_CLASSES)}")
+        
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            tool_name = name or fn.__name__
+            registered = fn
+            if execution != "inline":
+                registered = offload(fn, tool_name, execution, max_concurrency, min_offload_bytes, offload_args,
+                                     offload_if, timeout_ms)
+            super(GenieMCP, self).tool(name, **kwargs)(registered)
+            self._output_budgets[tool_name] = (
+                settings.TOOL_MAX_OUTPUT_BYTES if max_output_bytes is None else max_output_bytes
+            )
+            if not truncate:
+                self._untruncatable_tools.add(tool_name)
+            if not parallel:
+                self._serial_tools.add(tool_name)
+            # The module keeps the plain function, which the process pool pickles by name
+            return fn
+        
+        return decorator
+    
+    def is_parallel(self, name: str) -> bool:
+        """Whether a tool may run concurrently with other calls in a batch."""
+        return name not in self._serial_tools
+    
+    def validate_arguments(self, name: str, arguments: Dict[str, Any]) -> None:
+        """
+        Check arguments against a tool's input schema without running it.
+        
+        Raises:
+            ToolError: If the tool is unknown.
+            pydantic.ValidationError: If the arguments do not match the schema.
+        """
+        tool = self._tool_manager.get_tool(name)
+        if tool is None:
+            raise ToolError(f"Unknown tool: {name}")
+        tool.fn_metadata.arg_model.model_validate(tool.fn_metadata.pre_parse_json(arguments))
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool by name with arguments (MCP tools/call handler)."""
+        return await self.run_tool(name, arguments, convert_result=True)
+    
+    async def run_tool(self, name: str, arguments: Dict[str, Any], convert_result: bool = False) -> Any:
+        """
+        Run a registered tool, apply its output budget and record its metrics.
+        
+        The call runs under a trace id (kept from the calling tool, e.g.
+        batch_call, if there is one) that tags every log line it produces.
+        
+        Args:
+            name: Tool name.
+            arguments: Tool arguments as received from the client.
+            convert_result: Convert the result to MCP content, as tools/call returns it.
+                Leave False to get the tool's return value as-is.
+                
+        Returns:
+            The tool result.
+            
+        Raises:
+            ToolError: If the tool is unknown or raised.
+        """
+        tool = self._tool_manager.get_tool(name)
+        if tool is None:
+            raise ToolError(f"Unknown tool: {name}")
+        
+        trace_token = trace_id_var.set(trace_id_var.get() or new_trace_id())
+        tool_token = tool_var.set(name)
+        started = time.perf_counter()
+        result: Optional[Any] = None
+        serialized: Optional[bytes] = None
+        untrimmed: Optional[Any] = None
+        error = True
+        try:
+            result = await tool.run(arguments, context=self.get_context())
+            # Tools report handled failures as {"error": ...}
+            error = isinstance(result, dict) and "error" in result
+            serialized = to_json(result)
+            budget = self._output_budgets.get(name, settings.TOOL_MAX_OUTPUT_BYTES)
+            if not error and budget and len(serialized) > budget:
+                if name in self._untruncatable_tools:
+                    result = {"error": f"Result of {len(serialized)} bytes is over the {budget}-byte output budget "
+                                       f"of {name}; send a smaller input"}
+                    error = True
+                else:
+                    trimmed = apply_output_budget(result, budget, len(serialized))
+                    if trimmed is not result:
+                        untrimmed, result = result, trimmed
+                serialized = to_json(result)
+        finally:
+            elapsed = time.perf_counter() - started
+            result_bytes = len(serialized) if serialized is not None else 0
+            metrics.observe_tool_call(name, elapsed, json_size(arguments), result_bytes, error)
+            logger.info(
+                f"Tool {name} {'failed' if error else 'finished'} in {elapsed * 1000:.2f} ms",
+                extra={"elapsed_ms": round(elapsed * 1000, 2), "result_bytes": result_bytes, "error": error}
+            )
+            tool_var.reset(tool_token)
+            trace_id_var.reset(trace_token)
+        
+        if convert_result:
+            return _convert_result(tool, result, serialized, untrimmed)
+        return result
@@ -0,0 +1,16 @@
+"""
+HTTP routes served next to the streamable-http MCP endpoint.
+"""
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from app import mcp
+from app.utils.metrics import metrics
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """
+    Expose server metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,162 @@
+"""
+Batch tool for GENIE Server.
+
+Contains a meta-tool that runs several tool calls in one request, so an agent
+that needs ten conversions or five charts pays for one round trip instead of ten.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app import mcp
+from app.config import settings
+from app.utils.budget import json_size
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOOL = "batch_call"
+
+
+def _validation_message(error: ValidationError) -> str:
+    """One-line summary of a pydantic validation error."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'arguments'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _check_call(call: Any) -> Optional[str]:
+    """Validate one batch entry; returns an error message, or None if it can run."""
+    if not isinstance(call, dict):
+        return "Each call must be an object like {\"tool\": ..., \"arguments\": {...}}"
+    name = call.get("tool")
+    arguments = call.get("arguments", {})
+    if not isinstance(name, str) or not name:
+        return "Missing tool name"
+    if name == BATCH_TOOL:
+        return f"{BATCH_TOOL} cannot be nested"
+    if not isinstance(arguments, dict):
+        return "arguments must be an object"
+    try:
+        mcp.validate_arguments(name, arguments)
+    except ValidationError as e:
+        return f"Invalid arguments: {_validation_message(e)}"
+    except Exception as e:
+        return str(e)
+    return None
+
+
+async def _run_call(index: int, call: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run one validated call, capturing its error and elapsed time."""
+    name = call["tool"]
+    started = time.perf_counter()
+    outcome: Dict[str, Any] = {"index": index, "tool": name}
+    try:
+        async with semaphore:
+            result = await mcp.run_tool(name, call.get("arguments", {}))
+        # Tools report handled failures as {"error": ...}
+        if isinstance(result, dict) and "error" in result:
+            outcome["error"] = result["error"]
+        outcome["result"] = result
+    except Exception as e:
+        logger.error(f"Error in batch call {index} ({name}): {e}")
+        outcome["error"] = str(e)
+    outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return outcome
+
+
+def _apply_batch_budget(outcomes: List[Dict[str, Any]], max_bytes: int) -> None:
+    """
+    Replace the largest results by an error until all outcomes fit max_bytes.
+    
+    Every call keeps its entry, in order, so the client can tell which calls
+    to repeat on their own.
+    """
+    if not max_bytes:
+        return
+    sizes = {index: json_size(outcome) for index, outcome in enumerate(outcomes)}
+    total = json_size(outcomes)
+    for index in sorted(sizes, key=sizes.get, reverse=True):
+        if total <= max_bytes:
+            break
+        outcome = outcomes[index]
+        if "result" not in outcome:
+            continue
+        result_bytes = json_size(outcome.pop("result"))
+        outcome["error"] = (f"Result of {result_bytes} bytes is over the batch output budget "
+                            f"({max_bytes} bytes for all calls); call {outcome['tool']} on its own")
+        size = json_size(outcome)
+        total += size - sizes[index]
+        sizes[index] = size
+
+
+# Results are held to TOOL_BATCH_MAX_OUTPUT_BYTES together by dropping whole
+# results (see _apply_batch_budget()); the generic trimming would cut calls
+# from the end of "results" instead
+@mcp.tool(name=BATCH_TOOL, max_output_bytes=0)
+async def batch_call(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run several tool calls in one request, concurrently where possible.
+    
+    Use this instead of separate calls when you already know every call you need,
+    e.g. ten unit conversions or several charts. A failing call does not affect the others.
+    
+    Args:
+        calls: List of calls, each like {"tool": "convert_length", "arguments": {"value": 5,
+            "from_unit": "km", "to_unit": "mile"}}. Any tool except batch_call itself can be used.
+            
+    Returns:
+        Results in the order of the calls, each with "result" or "error", and elapsed_ms.
+        When all results together are too large, the largest are replaced by an error.
+    """
+    try:
+        if not calls:
+            raise ValueError("calls must contain at least one call")
+        if len(calls) > settings.TOOL_BATCH_MAX_CALLS:
+            raise ValueError(f"At most {settings.TOOL_BATCH_MAX_CALLS} calls are allowed per batch")
+    except Exception as e:
+        logger.error(f"Error in batch request: {e}")
+        return {"error": str(e)}
+    
+    started = time.perf_counter()
+    # Every call is validated before any runs, so argument mistakes cost no work
+    outcomes: List[Optional[Dict[str, Any]]] = []
+    for index, call in enumerate(calls):
+        error = _check_call(call)
+        if error is None:
+            outcomes.append(None)
+        else:
+            tool = call.get("tool") if isinstance(call, dict) else None
+            outcomes.append({"index": index, "tool": tool, "error": error, "elapsed_ms": 0.0})
+    
+    # Consecutive parallel-safe calls run together; a serial tool runs on its own,
+    # after the calls before it and before the calls after it
+    semaphore = asyncio.Semaphore(max(1, settings.TOOL_BATCH_CONCURRENCY))
+    group: List[int] = []
+    
+    async def flush() -> None:
+        results = await asyncio.gather(*(_run_call(index, calls[index], semaphore) for index in group))
+        for index, outcome in zip(group, results):
+            outcomes[index] = outcome
+        group.clear()
+    
+    for index, call in enumerate(calls):
+        if outcomes[index] is not None:
+            continue
+        if mcp.is_parallel(call["tool"]):
+            group.append(index)
+            continue
+        await flush()
+        outcomes[index] = await _run_call(index, call, semaphore)
+    await flush()
+    _apply_batch_budget(outcomes, settings.TOOL_BATCH_MAX_OUTPUT_BYTES)
+    
+    return {
+        "results": outcomes,
+        "count": len(outcomes),
+        "errors": sum(1 for outcome in outcomes if "error" in outcome),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
@@ -5,16 +5,135 @@ Contains tools useful for developers like code formatting, regex testing, color
 """
 import re
 import colorsys
-from typing import Any, Dict, List, Optional, Literal
+from typing import Any, Dict, Iterable, List, Optional, Literal
 
 from app import mcp
+from app.config import settings
+from app.utils.memoize import memoize
+from app.utils.streaming import open_source, regex_scanner, scan_chunks
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
 
-@mcp.tool()
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None)} - {None}
+_BACKREFS = {sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS}
+
+
+def _subpatterns(value: Any) -> Iterable[Any]:
+    """Subpatterns nested in one parsed regex item's arguments."""
+    if isinstance(value, sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _subpatterns(item)
+
+
+def _has_branch(parsed: Any) -> bool:
+    """Whether a parsed regex chooses between alternatives anywhere."""
+    return any(op == sre_parse.BRANCH or any(_has_branch(sub) for sub in _subpatterns(av)) for op, av in parsed)
+
+
+def _repeats(parsed: Any, found: List[Any]) -> bool:
+    """
+    Collect the repeats of a parsed regex into found.
+    
+    Returns:
+        Whether the regex has a backreference or a repeat containing a
+        choice between alternatives.
+    """
+    risky = False
+    for op, av in parsed:
+        if op in _BACKREFS:
+            return True
+        if op in _REPEATS and av[1] > 1:
+            found.append(av)
+            risky = risky or _has_branch(av[2])
+        for sub in _subpatterns(av):
+            risky = _repeats(sub, found) or risky
+    return risky
+
+
+def _may_backtrack(arguments: Dict[str, Any]) -> bool:
+    """
+    Whether a test_regex pattern could backtrack for long even on a short
+    input, so the call must run where it can be timed out.
+    
+    Only patterns with at most one repeat, no backreference and no
+    alternatives inside the repeat count as safe; the check errs towards
+    offloading.
+    """
+    try:
+        found: List[Any] = []
+        return _repeats(sre_parse.parse(arguments.get("pattern", "")), found) or len(found) > 1
+    except re.error:
+        # Invalid patterns fail fast
+        return False
+    except Exception:
+        return True
+
+
+def _match_info(match: "re.Match[str]", offset: int = 0) -> Dict[str, Any]:
+    """Describe one regex match; offset is added to its positions."""
+    match_info = {
+        "match": match.group(),
+        "start": offset + match.start(),
+        "end": offset + match.end(),
+        "groups": match.groups() if match.groups() else None
+    }
+    if match.groupdict():
+        match_info["named_groups"] = match.groupdict()
+    return match_info
+
+
+def _test_regex_stream(
+    compiled: "re.Pattern[str]",
+    pattern: str,
+    source: Iterable[str],
+    file_path: Optional[str]
+) -> Dict[str, Any]:
+    """
+    test_regex over a file or chunks. Positions are character offsets into the
+    whole input; only the first TOOL_STREAM_MAX_RESULTS matches are listed.
+    """
+    matches_info = []
+    match_count = 0
+    for start, _, match in scan_chunks(source, regex_scanner(compiled)):
+        match_count += 1
+        if len(matches_info) < settings.TOOL_STREAM_MAX_RESULTS:
+            matches_info.append(_match_info(match, start - match.start()))
+    
+    result = {
+        "pattern": pattern,
+        "valid_pattern": True,
+        "match_found": match_count > 0,
+        "match_count": match_count,
+        "matches": matches_info
+    }
+    if file_path is not None:
+        result["file_path"] = file_path
+    if match_count > len(matches_info):
+        result["limit_reached"] = True
+    return result
+
+
+# Small inputs with simple patterns run inline; anything that could backtrack
+# catastrophically runs in a worker process that is killed on timeout
+@mcp.tool(
+    execution="process",
+    max_concurrency=2,
+    min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES,
+    offload_args=("file_path",),
+    offload_if=_may_backtrack,
+    timeout_ms=settings.TOOL_REGEX_TIMEOUT_MS
+)
 def test_regex(
     pattern: str,
-    test_string: str,
-    flags: List[str] = []
+    test_string: str = "",
+    flags: List[str] = [],
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Test a regular expression pattern against a string and show matches.
@@ -23,6 +142,8 @@ def test_regex(
         pattern: Regular expression pattern to test
         test_string: String to test the pattern against
         flags: Optional list of flags: "i" (ignorecase), "m" (multiline), "s" (dotall)
+        file_path: Server-local file to test instead of test_string, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, tested as if joined, instead of test_string
         
     Returns:
         Match results including captured groups.
@@ -37,21 +158,14 @@ def test_regex(
             regex_flags |= re.DOTALL
         
         compiled = re.compile(pattern, regex_flags)
+        source = open_source(test_string, file_path, chunks)
+        if source is not None:
+            return _test_regex_stream(compiled, pattern, source, file_path)
         
         # Find all matches
         all_matches = list(compiled.finditer(test_string))
         
-        matches_info = []
-        for match in all_matches:
-            match_info = {
-                "match": match.group(),
-                "start": match.start(),
-                "end": match.end(),
-                "groups": match.groups() if match.groups() else None
-            }
-            if match.groupdict():
-                match_info["named_groups"] = match.groupdict()
-            matches_info.append(match_info)
+        matches_info = [_match_info(match) for match in all_matches]
         
         return {
             "pattern": pattern,
@@ -67,9 +181,12 @@ def test_regex(
             "valid_pattern": False,
             "error": str(e)
         }
+    except Exception as e:
+        return {"error": str(e)}
 
 
 @mcp.tool()
+@memoize
 def convert_color(
     color: str,
     to_format: Literal["hex", "rgb", "hsl"] = "hex"
@@ -140,6 +257,7 @@ def convert_color(
 
 
 @mcp.tool()
+@memoize
 def generate_color_palette(
     base_color: str,
     palette_type: Literal["complementary", "analogous", "triadic", "shades"] = "shades"
@@ -221,7 +339,7 @@ def generate_color_palette(
         return {"error": str(e)}
 
 
-@mcp.tool()
+@mcp.tool(truncate=False)
 def escape_string(
     text: str,
     escape_type: Literal["html", "json", "regex", "sql", "url"] = "html"
@@ -274,7 +392,7 @@ def escape_string(
     }
 
 
-@mcp.tool()
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES)
 def diff_text(text1: str, text2: str) -> Dict[str, Any]:
     """
     Compare two texts and show the differences.
@@ -318,7 +436,7 @@ def diff_text(text1: str, text2: str) -> Dict[str, Any]:
     }
 
 
-@mcp.tool()
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES)
 def minify_json(json_string: str) -> Dict[str, Any]:
     """
     Minify a JSON string by removing whitespace.
@@ -354,7 +472,7 @@ def minify_json(json_string: str) -> Dict[str, Any]:
         }
 
 
-@mcp.tool()
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES)
 def count_code_lines(
     code: str,
     language: Literal["python", "javascript", "java", "cpp", "generic"] = "generic"
@@ -2,41 +2,524 @@
 Data tools for GENIE Server.
 
 Contains tools for database data retrieval.
+
+pymongo and bson are imported inside the tools rather than at module level,
+so registering these tools (and listing them) does not pay for loading the
+database driver; it is loaded on the first data call.
 """
-import json
+import asyncio
 import logging
-from typing import Any, Dict, List
-
-from bson import json_util
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from app import mcp
-from app.database import get_collection
+from app.config import settings
+from app.utils.budget import json_size
 
 logger = logging.getLogger(__name__)
 
+# Aggregation stages that only read and reshape data
+_ALLOWED_STAGES = {"$match", "$group", "$project", "$sort", "$limit"}
+# Operators that run server-side JavaScript
+_FORBIDDEN_OPERATORS = {"$where", "$function", "$accumulator"}
 
-@mcp.tool()
-def get_userData(query: Dict[str, Any] = {}, limit: int = 10) -> List[Dict[str, Any]]:
+
+def _is_projected(field: str, projected: List[str]) -> bool:
+    """Check whether a dotted field is returned by an inclusion projection."""
+    return any(field == p or field.startswith(p + ".") for p in projected)
+
+
+def _overlaps(field: str, other: str) -> bool:
+    """Check whether two dotted fields are the same or one contains the other."""
+    return field == other or field.startswith(other + ".") or other.startswith(field + ".")
+
+
+def _build_projection(
+    fields: List[str],
+    exclude_fields: List[str],
+    sort: List[Tuple[str, int]]
+) -> Tuple[Optional[Dict[str, int]], List[str], Optional[List[str]]]:
     """
-    Retrieves documents from a local MongoDB database.
+    Build a MongoDB projection and how to trim returned documents back to it.
+    
+    Keyset paging needs the whole sort keys of the last document, so sort
+    fields the caller did not ask for are projected anyway and removed before
+    returning. This includes sort fields that only overlap a requested or
+    excluded field: sorting on "profile" needs all of it even when only
+    "profile.age" was asked for, and sorting on "profile.age" needs it even
+    when "profile" was excluded.
     
     Args:
-        query: MongoDB query filter (as a dictionary). Defaults to empty (find all).
-        limit: Maximum number of documents to return. Defaults to 10.
+        fields: Fields to include (empty means all fields).
+        exclude_fields: Fields to exclude; only "_id" may be combined with fields.
+        sort: Normalized sort specification.
         
     Returns:
-        List[Dict]: List of documents matching the query.
+        Tuple of (projection or None, dotted fields to strip from each
+        document, dotted fields to keep in each document or None to keep all).
     """
-    try:
-        collection = get_collection("users")
-        cursor = collection.find(query).limit(limit)
+    if fields and any(f != "_id" for f in exclude_fields):
+        raise ValueError("Use either fields or exclude_fields; only '_id' may be excluded alongside fields")
+    
+    strip: List[str] = []
+    
+    if fields:
+        projection = {field: 1 for field in fields}
+        keep = list(fields)
+        if "_id" in exclude_fields:
+            projection["_id"] = 0
+        else:
+            keep.append("_id")
+        added = False
+        for field, _ in sort:
+            included = [p for p, value in projection.items() if value] + ([] if "_id" in projection else ["_id"])
+            if _is_projected(field, included):
+                continue
+            # MongoDB rejects a path together with one inside it, so the sort
+            # field replaces the requested fields it contains
+            for child in [p for p in projection if p.startswith(field + ".")]:
+                del projection[child]
+            projection[field] = 1
+            added = True
+        return projection, strip, keep if added else None
+    
+    if exclude_fields:
+        sort_fields = [field for field, _ in sort]
+        projection = {}
+        for field in exclude_fields:
+            if any(_overlaps(field, sort_field) for sort_field in sort_fields):
+                strip.append(field)
+            else:
+                projection[field] = 0
+        return projection or None, strip, None
+    
+    return None, strip, None
+
+
+def _strip_fields(doc: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Return a copy of a document without the given dotted fields.
+    
+    Only the dictionaries along each path are copied; the rest is shared.
+    """
+    doc = dict(doc)
+    for field in fields:
+        parts = field.split(".")
+        node = doc
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                break
+            node[part] = node = dict(child)
+        else:
+            node.pop(parts[-1], None)
+    return doc
+
+
+def _keep_fields(doc: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Return a copy of a document with only the given dotted fields, as an
+    inclusion projection would.
+    
+    Paths through arrays apply to each embedded document in them.
+    """
+    nested: Dict[str, List[str]] = {}
+    for field in fields:
+        head, _, rest = field.partition(".")
+        nested.setdefault(head, []).append(rest)
+    kept = {}
+    for key, value in doc.items():
+        rests = nested.get(key)
+        if rests is None:
+            continue
+        if "" in rests:
+            kept[key] = value
+        elif isinstance(value, dict):
+            kept[key] = _keep_fields(value, rests)
+        elif isinstance(value, list):
+            kept[key] = [_keep_fields(item, rests) for item in value if isinstance(item, dict)]
+    return kept
+
+
+async def _find_page(
+    collection_name: str,
+    query: Dict[str, Any],
+    limit: int = 10,
+    fields: List[str] = [],
+    exclude_fields: List[str] = [],
+    sort: Dict[str, int] = {},
+    hint: Optional[str] = None,
+    page_token: Optional[str] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Fetch one keyset-paginated page of documents, served from the cache when possible.
+    
+    Raises:
+        ValueError: On invalid arguments or page tokens.
+        PyMongoError: On database errors.
+    """
+    from app.database import get_async_collection, killable_operation, query_cache, query_recorder
+    from app.database.pagination import (
+        apply_keyset,
+        decode_page_token,
+        encode_page_token,
+        normalize_sort,
+        query_fingerprint,
+        sort_values,
+    )
+    from app.utils.serialization import bson_to_json
+    
+    limit = max(1, min(limit, settings.DATA_MAX_PAGE_SIZE))
+    sort_spec = normalize_sort(sort)
+    projection, strip, keep = _build_projection(fields, exclude_fields, sort_spec)
+    fingerprint = query_fingerprint(query, sort_spec)
+    after = decode_page_token(page_token, fingerprint) if page_token else None
+    
+    # Async client: a slow query must not block other tools on the event loop
+    collection = get_async_collection(collection_name)
+    cache_key = query_cache.make_key(
+        collection.full_name,
+        query,
+        limit=limit,
+        fields=sorted(fields),
+        exclude_fields=sorted(exclude_fields),
+        sort=sort_spec,
+        hint=hint,
+        page_token=page_token
+    )
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = query_cache.begin(collection)
+    
+    # Fetch one extra document to learn whether another page exists.
+    # The comment lets a cancelled request kill its query on the server.
+    async with killable_operation(collection.database.client, "find") as comment:
+        cursor = collection.find(apply_keyset(query, sort_spec, after), projection, comment=comment)
+        cursor = cursor.sort(sort_spec).limit(limit + 1)
+        if settings.DATA_QUERY_MAX_TIME_MS > 0:
+            cursor = cursor.max_time_ms(settings.DATA_QUERY_MAX_TIME_MS)
+        if hint:
+            cursor = cursor.hint(hint)
+        if batch_size:
+            cursor = cursor.batch_size(max(1, min(batch_size, limit + 1)))
         
         # BSON conversion to make it JSON serializable for MCP
+        started = time.perf_counter()
         results = []
-        for doc in cursor:
-            results.append(json.loads(json_util.dumps(doc)))
+        last_doc = None
+        has_more = False
+        truncated = False
+        page_bytes = 0
+        async for doc in cursor:
+            if len(results) == limit:
+                has_more = True
+                break
+            if keep is not None:
+                converted = bson_to_json(_keep_fields(doc, keep))
+            else:
+                converted = bson_to_json(_strip_fields(doc, strip) if strip else doc)
+            if settings.TOOL_MAX_OUTPUT_BYTES:
+                # Over the output budget, end the page early: the page token
+                # then resumes right after the last document returned
+                page_bytes += json_size(converted)
+                if page_bytes > settings.TOOL_MAX_OUTPUT_BYTES and results:
+                    has_more = truncated = True
+                    break
+            last_doc = doc
+            results.append(converted)
+        await cursor.close()
+    query_recorder.record(collection, query, sort_spec, (time.perf_counter() - started) * 1000, len(results))
+    
+    next_token = encode_page_token(fingerprint, sort_values(last_doc, sort_spec)) if has_more else None
+    
+    page = {
+        "documents": results,
+        "count": len(results),
+        "next_page_token": next_token
+    }
+    if truncated:
+        page["truncated"] = True
+    query_cache.put(cache_key, collection.full_name, page, generation)
+    return page
+
+
+# Pages end early instead of being truncated, so page tokens stay valid
+@mcp.tool(max_output_bytes=0)
+async def get_userData(
+    query: Dict[str, Any] = {},
+    limit: int = 10,
+    fields: List[str] = [],
+    exclude_fields: List[str] = [],
+    sort: Dict[str, int] = {},
+    hint: Optional[str] = None,
+    page_token: Optional[str] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Retrieves documents from a local MongoDB database, one page at a time.
+    
+    Request only the fields you need: narrow queries are faster and return smaller results.
+    
+    Args:
+        query: MongoDB query filter (as a dictionary). Defaults to empty (find all).
+        limit: Maximum number of documents per page. Defaults to 10 (server-capped).
+            Pages over the output-size budget end early, with "truncated": true.
+        fields: Fields to return (e.g., ["name", "steps"]). Defaults to all fields.
+        exclude_fields: Fields to leave out (e.g., ["history"]). Only "_id" may be combined with fields.
+        sort: Sort order as {field: 1 (ascending) or -1 (descending)}, e.g. {"steps": -1}.
+        hint: Optional name of an index MongoDB should use for the query.
+        page_token: "next_page_token" from a previous call with the same query and sort, to fetch the next page.
+        batch_size: Optional number of documents MongoDB sends per network round trip.
         
-        return results
+    Returns:
+        Page of matching documents with a "next_page_token" (null on the last page).
+    """
+    try:
+        return await _find_page(
+            "users",
+            query,
+            limit=limit,
+            fields=fields,
+            exclude_fields=exclude_fields,
+            sort=sort,
+            hint=hint,
+            page_token=page_token,
+            batch_size=batch_size
+        )
     except Exception as e:
         logger.error(f"Error retrieving user data: {e}")
-        return [{"error": str(e)}]
+        return {"error": str(e)}
+
+
+def _projection_fields(projection: Any) -> Tuple[List[str], List[str]]:
+    """
+    Split a batch spec projection into (fields, exclude_fields).
+    
+    Accepts a list of field names or a MongoDB-style {field: 1 | 0} document.
+    """
+    if not projection:
+        return [], []
+    if isinstance(projection, list):
+        return list(projection), []
+    if isinstance(projection, dict):
+        fields = [name for name, flag in projection.items() if flag]
+        exclude_fields = [name for name, flag in projection.items() if not flag]
+        return fields, exclude_fields
+    raise ValueError("projection must be a list of fields or a {field: 1 | 0} document")
+
+
+async def _run_spec(key: str, spec: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run one batch spec, capturing its error and elapsed time."""
+    started = time.perf_counter()
+    try:
+        if not isinstance(spec, dict):
+            raise ValueError("Each spec must be an object")
+        collection = spec.get("collection", "users")
+        if not collection or collection.startswith("system."):
+            raise ValueError(f"Invalid collection name: {collection!r}")
+        fields, exclude_fields = _projection_fields(spec.get("projection"))
+        async with semaphore:
+            result = await _find_page(
+                collection,
+                spec.get("query") or {},
+                limit=spec.get("limit", 10),
+                fields=fields,
+                exclude_fields=exclude_fields,
+                sort=spec.get("sort") or {},
+                page_token=spec.get("page_token")
+            )
+    except Exception as e:
+        logger.error(f"Error in batch spec {key}: {e}")
+        result = {"error": str(e)}
+    return {**result, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+@mcp.tool()
+async def batch_get_data(specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run several independent MongoDB lookups in one call, concurrently.
+    
+    Use this instead of repeated get_userData calls when you need multiple unrelated queries.
+    A failing spec does not affect the others.
+    
+    Args:
+        specs: List of lookups, each like {"id": "alice", "collection": "users", "query": {"name": "Alice"},
+            "projection": ["name", "steps"], "limit": 5}. Only "query" is required; "collection" defaults
+            to "users", "projection" may also be {field: 1 | 0}, and "sort"/"page_token" work as in get_userData.
+            
+    Returns:
+        Results keyed by spec id (or position when no id is given), each with documents or an error, and elapsed_ms.
+    """
+    try:
+        if not specs:
+            raise ValueError("specs must contain at least one lookup")
+        if len(specs) > settings.DATA_BATCH_MAX_SPECS:
+            raise ValueError(f"At most {settings.DATA_BATCH_MAX_SPECS} specs are allowed per batch")
+        keys = [
+            str(spec.get("id", index)) if isinstance(spec, dict) else str(index)
+            for index, spec in enumerate(specs)
+        ]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Spec ids must be unique")
+    except Exception as e:
+        logger.error(f"Error in batch request: {e}")
+        return {"error": str(e)}
+    
+    # Bounded so one batch cannot take over the shared connection pool
+    semaphore = asyncio.Semaphore(max(1, settings.DATA_BATCH_CONCURRENCY))
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(_run_spec(key, spec, semaphore) for key, spec in zip(keys, specs)))
+    return {
+        "results": dict(zip(keys, outcomes)),
+        "errors": sum(1 for outcome in outcomes if "error" in outcome),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def _check_operators(value: Any) -> None:
+    """Reject JavaScript operators anywhere inside a pipeline stage."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in _FORBIDDEN_OPERATORS:
+                raise ValueError(f"Operator {key} is not allowed")
+            _check_operators(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_operators(item)
+
+
+def _validate_pipeline(pipeline: List[Dict[str, Any]]) -> None:
+    """
+    Ensure a pipeline only uses read-only stages and no server-side JavaScript.
+    
+    Raises:
+        ValueError: If a stage or operator is not allowed.
+    """
+    if not pipeline:
+        raise ValueError("Pipeline must contain at least one stage")
+    for index, stage in enumerate(pipeline):
+        if not isinstance(stage, dict) or len(stage) != 1:
+            raise ValueError(f"Stage {index} must be a single-key document like {{\"$match\": {{...}}}}")
+        name = next(iter(stage))
+        if name not in _ALLOWED_STAGES:
+            allowed = ", ".join(sorted(_ALLOWED_STAGES))
+            raise ValueError(f"Stage {index} uses {name}; allowed stages are {allowed}")
+        _check_operators(stage[name])
+
+
+@mcp.tool()
+async def aggregate_data(
+    pipeline: List[Dict[str, Any]],
+    collection: str = "users",
+    allow_disk_use: bool = False,
+    max_time_ms: int = 10000
+) -> Dict[str, Any]:
+    """
+    Run a MongoDB aggregation pipeline and return only the aggregated result.
+    
+    Prefer this over fetching raw documents for summaries such as averages, totals or counts per group.
+    Allowed stages: $match, $group, $project, $sort, $limit.
+    
+    Args:
+        pipeline: List of stages, e.g. [{"$group": {"_id": "$user_id", "avg_steps": {"$avg": "$steps"}}}]
+        collection: Collection to aggregate. Defaults to "users".
+        allow_disk_use: Let large $group/$sort stages spill to disk on the database server.
+        max_time_ms: Time limit for the aggregation in milliseconds (server-capped).
+        
+    Returns:
+        Aggregated documents, their count, and whether the output was truncated.
+    """
+    from app.database import get_async_collection, killable_operation, query_cache
+    from app.utils.serialization import bson_to_json
+    
+    try:
+        _validate_pipeline(pipeline)
+        if not collection or collection.startswith("system."):
+            raise ValueError(f"Invalid collection name: {collection!r}")
+        
+        cap = settings.DATA_MAX_PAGE_SIZE
+        max_time_ms = max(1, min(max_time_ms, settings.DATA_AGGREGATE_MAX_TIME_MS))
+        # One extra result past the cap reveals truncation
+        bounded = list(pipeline) + [{"$limit": cap + 1}]
+        
+        target = get_async_collection(collection)
+        cache_key = query_cache.make_key(
+            target.full_name,
+            {},
+            pipeline=pipeline,
+            allow_disk_use=allow_disk_use
+        )
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = query_cache.begin(target)
+        
+        async with killable_operation(target.database.client, "aggregate") as comment:
+            cursor = await target.aggregate(
+                bounded,
+                allowDiskUse=allow_disk_use,
+                maxTimeMS=max_time_ms,
+                comment=comment
+            )
+            results = []
+            truncated = False
+            async for doc in cursor:
+                if len(results) == cap:
+                    truncated = True
+                    break
+                results.append(bson_to_json(doc))
+            await cursor.close()
+        
+        output = {
+            "results": results,
+            "count": len(results),
+            "truncated": truncated
+        }
+        query_cache.put(cache_key, target.full_name, output, generation)
+        return output
+    except Exception as e:
+        logger.error(f"Error running aggregation: {e}")
+        return {"error": str(e)}
+
+
+@mcp.tool()
+def get_data_cache_stats() -> Dict[str, Any]:
+    """
+    Report the data query cache size and hit, miss and eviction counters.
+    
+    Returns:
+        Cache statistics including hit rate and watched collections.
+    """
+    from app.database import query_cache
+    
+    return query_cache.stats()
+
+
+# analyze=True explains (and may index) every hot shape; keep it out of concurrent batches
+@mcp.tool(parallel=False)
+async def get_query_report(top: int = 10, analyze: bool = False) -> Dict[str, Any]:
+    """
+    Report the slowest MongoDB query shapes seen by the data tools and how they are executed.
+    
+    Each shape is a filter with its values replaced by "?". Shapes that scan the whole
+    collection or sort in memory come with a suggested index.
+    
+    Args:
+        top: Number of shapes to report, ordered by total time spent. Defaults to 10.
+        analyze: Re-run the query plan analysis for the reported shapes before answering.
+        
+    Returns:
+        Query shapes with call counts, latency, query plan and suggested index.
+    """
+    from app.database import query_recorder
+    
+    try:
+        top = max(1, top)
+        if analyze:
+            await query_recorder.analyze(top)
+        return query_recorder.report(top)
+    except Exception as e:
+        logger.error(f"Error building query report: {e}")
+        return {"error": str(e)}
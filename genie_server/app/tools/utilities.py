@@ -9,11 +9,14 @@ import string
 import uuid
 import base64
 import json
-import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Literal, Optional
 
 from app import mcp
+from app.config import settings
+from app.utils.memoize import memoize
+from app.utils.streaming import open_source
+from app.utils.text_stats import TextStats
 
 
 # ============================================================================
@@ -108,7 +111,7 @@ def generate_uuid(version: Literal["v4", "v1"] = "v4", count: int = 1) -> Dict[s
     }
 
 
-@mcp.tool()
+@mcp.tool(execution="thread", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES)
 def hash_text(
     text: str,
     algorithm: Literal["md5", "sha1", "sha256", "sha512"] = "sha256"
@@ -141,7 +144,7 @@ def hash_text(
     }
 
 
-@mcp.tool()
+@mcp.tool(truncate=False)
 def encode_base64(text: str, decode: bool = False) -> Dict[str, str]:
     """
     Encode text to Base64 or decode Base64 to text.
@@ -172,33 +175,31 @@ def encode_base64(text: str, decode: bool = False) -> Dict[str, str]:
         return {"error": str(e)}
 
 
-@mcp.tool()
-def word_count(text: str) -> Dict[str, Any]:
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def word_count(
+    text: str = "",
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Analyze text and return word count, character count, and other statistics.
     
     Args:
         text: The text to analyze
+        file_path: Server-local file to analyze instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, analyzed as if joined, instead of text
         
     Returns:
         Comprehensive text statistics.
     """
-    words = text.split()
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    paragraphs = text.split('\n\n')
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
-    
-    return {
-        "characters": len(text),
-        "characters_no_spaces": len(text.replace(" ", "").replace("\n", "")),
-        "words": len(words),
-        "sentences": len(sentences),
-        "paragraphs": len(paragraphs),
-        "average_word_length": round(sum(len(w) for w in words) / max(len(words), 1), 2),
-        "reading_time_minutes": round(len(words) / 200, 1),  # Average reading speed
-        "speaking_time_minutes": round(len(words) / 130, 1)  # Average speaking speed
-    }
+    stats = TextStats()
+    try:
+        source = open_source(text, file_path, chunks)
+        for chunk in ([text] if source is None else source):
+            stats.feed(chunk)
+    except Exception as e:
+        return {"error": str(e)}
+    return stats.finish().result()
 
 
 # ============================================================================
@@ -345,6 +346,7 @@ def calculate_bmi(weight_kg: float, height_cm: float) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@memoize
 def calculate_loan(
     principal: float,
     annual_rate: float,
@@ -389,6 +391,7 @@ def calculate_loan(
 # ============================================================================
 
 @mcp.tool()
+@memoize
 def convert_temperature(
     value: float,
     from_unit: Literal["celsius", "fahrenheit", "kelvin"],
@@ -429,6 +432,7 @@ def convert_temperature(
 
 
 @mcp.tool()
+@memoize
 def convert_length(
     value: float,
     from_unit: Literal["mm", "cm", "m", "km", "inch", "foot", "yard", "mile"],
@@ -462,6 +466,7 @@ def convert_length(
 
 
 @mcp.tool()
+@memoize
 def convert_weight(
     value: float,
     from_unit: Literal["mg", "g", "kg", "oz", "lb", "ton"],
@@ -495,6 +500,7 @@ def convert_weight(
 
 
 @mcp.tool()
+@memoize
 def convert_data_size(
     value: float,
     from_unit: Literal["B", "KB", "MB", "GB", "TB", "PB"],
@@ -635,7 +641,7 @@ def add_days_to_date(
 # JSON & DATA TOOLS
 # ============================================================================
 
-@mcp.tool()
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES)
 def format_json(json_string: str, indent: int = 2) -> Dict[str, Any]:
     """
     Format/prettify a JSON string for better readability.
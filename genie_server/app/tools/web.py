@@ -4,15 +4,155 @@ Web/Internet tools for GENIE Server.
 Contains tools for web-related operations like URL parsing, QR codes, and web data.
 """
 import re
+import sys
 import urllib.parse
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
 from datetime import datetime
 import json
 
 from app import mcp
+from app.config import settings
+from app.utils.memoize import memoize
+from app.utils.psl import DomainParts, get_psl
+from app.utils.streaming import UniqueValues, iter_lines, open_source, regex_scanner, scan_chunks
+
+# Entity patterns, compiled once at import
+_ENTITY_PATTERNS = {
+    "urls": r'https?://[^\s<>"\'{}|\\^`\[\]]+',
+    "emails": r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+    "hashtags": r'#[a-zA-Z0-9_]+',
+    "mentions": r'@[a-zA-Z0-9_]+',
+}
+ENTITY_TYPES = tuple(_ENTITY_PATTERNS)
+_URL_RE = re.compile(_ENTITY_PATTERNS["urls"])
+_EMAIL_RE = re.compile(_ENTITY_PATTERNS["emails"])
+_EMAIL_FULL_RE = re.compile(f'^{_ENTITY_PATTERNS["emails"]}$')
+_HASHTAG_RE = re.compile(_ENTITY_PATTERNS["hashtags"])
+_MENTION_RE = re.compile(_ENTITY_PATTERNS["mentions"])
+# Single-pass scanner for extract_entities. Every entity contains an anchor:
+# a URL starts with "http", a hashtag with "#", and emails and mentions have an
+# "@". Only those anchors are searched for; an email's local part is then read
+# backwards from its "@". (One alternation of all four patterns would be slower
+# than four scans: the email pattern has no literal prefix, so the regex engine
+# would try every branch at every position.)
+_ANCHOR_RE = re.compile(f'{_ENTITY_PATTERNS["urls"]}|{_ENTITY_PATTERNS["hashtags"]}|@')
+_EMAIL_LOCAL_REVERSED_RE = re.compile(r'[a-zA-Z0-9._%+-]*')
+
+
+def _email_local_start(text: str, floor: int, at: int) -> int:
+    """Start of the email local part ending at "@" position at, not before floor."""
+    window = 64
+    while True:
+        low = max(floor, at - window)
+        length = _EMAIL_LOCAL_REVERSED_RE.match(text[low:at][::-1]).end()
+        if length < at - low or low == floor:
+            return at - length
+        window *= 4
+
+
+def _iter_entities(text: str, pos: int = 0) -> Iterator[Tuple[int, int, Tuple[str, str]]]:
+    """
+    Find URLs, emails, hashtags and mentions in one left-to-right pass.
+    
+    Matches do not overlap and the leftmost one wins, with URL before email
+    before hashtag before mention at the same position, as if the four patterns
+    were one alternation. Yields (start, end, (type, entity)), so it can also
+    serve as a streaming scanner.
+    """
+    search = _ANCHOR_RE.search
+    while True:
+        anchor = search(text, pos)
+        if anchor is None:
+            return
+        token = anchor.group()
+        if token == "@":
+            at = anchor.start()
+            start = _email_local_start(text, pos, at)
+            entity = _EMAIL_RE.match(text, start) if start < at else None
+            if entity is not None:
+                yield start, entity.end(), ("emails", entity.group())
+                pos = entity.end()
+                continue
+            entity = _MENTION_RE.match(text, at)
+            if entity is not None:
+                yield at, entity.end(), ("mentions", entity.group())
+                pos = entity.end()
+            else:
+                pos = at + 1
+        else:
+            yield anchor.start(), anchor.end(), ("hashtags" if token[0] == "#" else "urls", token)
+            pos = anchor.end()
+
+
+def _unique(items: List[str]) -> List[str]:
+    """Drop duplicates, keeping first-seen order."""
+    return list(dict.fromkeys(items))
+
+
+def _unique_matches(
+    pattern: "re.Pattern[str]",
+    text: str,
+    file_path: Optional[str],
+    chunks: Optional[List[str]]
+) -> Tuple[List[str], bool]:
+    """
+    Distinct matches of a pattern in first-seen order, from text, a file or chunks.
+    
+    Returns:
+        The matches, and whether TOOL_STREAM_MAX_RESULTS cut them short
+        (streamed input only).
+        
+    Raises:
+        ValueError: If more than one input was given or the file cannot be read.
+    """
+    source = open_source(text, file_path, chunks)
+    if source is None:
+        return _unique(pattern.findall(text)), False
+    found = UniqueValues(settings.TOOL_STREAM_MAX_RESULTS)
+    for _, _, match in scan_chunks(source, regex_scanner(pattern)):
+        found.add(match.group())
+    return list(found.values), found.limit_reached
+
+
+def _parse_url(url: str) -> Dict[str, Any]:
+    """
+    Components of a URL, as parse_url returns them.
+    
+    Raises:
+        ValueError: If the URL cannot be parsed (e.g. a non-numeric port).
+    """
+    parsed = urllib.parse.urlparse(url)
+    return {
+        "scheme": parsed.scheme or "https",
+        "domain": parsed.netloc,
+        "path": parsed.path or "/",
+        "query_string": parsed.query,
+        "query_params": dict(urllib.parse.parse_qsl(parsed.query)),
+        "fragment": parsed.fragment,
+        "port": parsed.port
+    }
+
+
+def _join_url(base_url: str, path: str, query_params: Dict[str, str]) -> Tuple[str, str, str]:
+    """Build a URL as build_url does; returns the URL and the normalized base and path."""
+    # Ensure base_url doesn't end with slash if path starts with one
+    if base_url.endswith('/') and path.startswith('/'):
+        base_url = base_url[:-1]
+    elif not base_url.endswith('/') and path and not path.startswith('/'):
+        path = '/' + path
+    
+    full_url = base_url + path
+    
+    if query_params:
+        query_string = urllib.parse.urlencode(query_params)
+        full_url = f"{full_url}?{query_string}"
+    
+    return full_url, base_url, path
 
 
 @mcp.tool()
+@memoize
 def parse_url(url: str) -> Dict[str, Any]:
     """
     Parse a URL and extract its components (protocol, domain, path, query params, etc.).
@@ -24,30 +164,17 @@ def parse_url(url: str) -> Dict[str, Any]:
         Parsed URL components including protocol, domain, path, query parameters.
     """
     try:
-        parsed = urllib.parse.urlparse(url)
-        query_params = dict(urllib.parse.parse_qsl(parsed.query))
-        
-        return {
-            "valid": True,
-            "original_url": url,
-            "scheme": parsed.scheme or "https",
-            "domain": parsed.netloc,
-            "path": parsed.path or "/",
-            "query_string": parsed.query,
-            "query_params": query_params,
-            "fragment": parsed.fragment,
-            "port": parsed.port
-        }
+        return {"valid": True, "original_url": url, **_parse_url(url)}
     except Exception as e:
         return {"valid": False, "error": str(e)}
 
 
-@mcp.tool()
+@mcp.tool(truncate=False)
 def build_url(
     base_url: str,
     path: str = "",
     query_params: Dict[str, str] = {}
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
     Build a URL from components (base URL, path, and query parameters).
     
@@ -59,17 +186,7 @@ def build_url(
     Returns:
         The constructed URL.
     """
-    # Ensure base_url doesn't end with slash if path starts with one
-    if base_url.endswith('/') and path.startswith('/'):
-        base_url = base_url[:-1]
-    elif not base_url.endswith('/') and path and not path.startswith('/'):
-        path = '/' + path
-    
-    full_url = base_url + path
-    
-    if query_params:
-        query_string = urllib.parse.urlencode(query_params)
-        full_url = f"{full_url}?{query_string}"
+    full_url, base_url, path = _join_url(base_url, path, query_params)
     
     return {
         "url": full_url,
@@ -79,7 +196,107 @@ def build_url(
     }
 
 
-@mcp.tool()
+# Columns of parse_urls' result, in order
+_URL_COLUMNS = ("scheme", "domain", "path", "query_params", "fragment", "port")
+
+
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, max_output_bytes=0)
+def parse_urls(urls: List[str], group_by_domain: bool = False) -> Dict[str, Any]:
+    """
+    Parse many URLs in one call, e.g. to clean up a crawl list.
+    
+    Results are columnar: each column holds one value per input URL, in input order,
+    with null for URLs that could not be parsed (listed in errors).
+    
+    Args:
+        urls: URLs to parse
+        group_by_domain: Also return the indices of the URLs of each domain
+        
+    Returns:
+        Columns scheme, domain, path, query_params, fragment and port, plus per-URL errors.
+    """
+    if len(urls) > settings.TOOL_BULK_MAX_ITEMS:
+        return {"error": f"At most {settings.TOOL_BULK_MAX_ITEMS} URLs are allowed per call"}
+    
+    columns: Dict[str, List[Any]] = {name: [] for name in _URL_COLUMNS}
+    errors: List[Dict[str, Any]] = []
+    # Repeated URLs are parsed once
+    parsed_urls: Dict[str, Any] = {}
+    for index, url in enumerate(urls):
+        parsed = parsed_urls.get(url)
+        if parsed is None:
+            try:
+                parsed = _parse_url(url)
+            except Exception as e:
+                parsed = e
+            parsed_urls[url] = parsed
+        if isinstance(parsed, Exception):
+            errors.append({"index": index, "url": url, "error": str(parsed)})
+            parsed = dict.fromkeys(_URL_COLUMNS)
+        for name, column in columns.items():
+            column.append(parsed[name])
+    
+    result: Dict[str, Any] = {
+        "count": len(urls),
+        "unique_count": len(parsed_urls),
+        "columns": columns,
+        "errors": errors,
+        "error_count": len(errors)
+    }
+    if group_by_domain:
+        by_domain: Dict[str, List[int]] = {}
+        for index, domain in enumerate(columns["domain"]):
+            if domain is not None:
+                by_domain.setdefault(domain, []).append(index)
+        result["by_domain"] = by_domain
+    return result
+
+
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, max_output_bytes=0)
+def build_urls(items: List[Dict[str, Any]], base_url: str = "") -> Dict[str, Any]:
+    """
+    Build many URLs in one call, each from a base URL, path and query parameters.
+    
+    Args:
+        items: One entry per URL, like {"path": "/users/1", "query_params": {"page": "2"}}.
+            An entry may set its own "base_url".
+        base_url: Base URL for entries without one (e.g., "https://api.example.com")
+        
+    Returns:
+        The URLs in input order, with null for entries that failed (listed in errors).
+    """
+    if len(items) > settings.TOOL_BULK_MAX_ITEMS:
+        return {"error": f"At most {settings.TOOL_BULK_MAX_ITEMS} items are allowed per call"}
+    
+    urls: List[Optional[str]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Each item must be an object")
+            item_base = item.get("base_url", base_url)
+            path = item.get("path", "")
+            query_params = item.get("query_params", {})
+            if not item_base or not isinstance(item_base, str):
+                raise ValueError("Missing base_url")
+            if not isinstance(path, str):
+                raise ValueError("path must be a string")
+            if not isinstance(query_params, dict):
+                raise ValueError("query_params must be an object")
+            urls.append(_join_url(item_base, path, query_params)[0])
+        except Exception as e:
+            urls.append(None)
+            errors.append({"index": index, "error": str(e)})
+    
+    return {
+        "urls": urls,
+        "count": len(urls),
+        "errors": errors,
+        "error_count": len(errors)
+    }
+
+
+@mcp.tool(truncate=False)
 def encode_url(text: str, decode: bool = False) -> Dict[str, str]:
     """
     URL encode or decode a string.
@@ -110,40 +327,59 @@ def encode_url(text: str, decode: bool = False) -> Dict[str, str]:
         return {"error": str(e)}
 
 
-@mcp.tool()
-def extract_emails(text: str) -> Dict[str, Any]:
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def extract_emails(
+    text: str = "",
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Extract all email addresses from a given text.
     
     Args:
         text: Text to search for email addresses
+        file_path: Server-local file to search instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, searched as if joined, instead of text
         
     Returns:
         List of found email addresses.
     """
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = list(set(re.findall(email_pattern, text)))
+    try:
+        emails, limit_reached = _unique_matches(_EMAIL_RE, text, file_path, chunks)
+    except Exception as e:
+        return {"error": str(e)}
     
-    return {
+    result = {
         "emails": emails,
         "count": len(emails),
         "unique": True
     }
+    if limit_reached:
+        result["limit_reached"] = True
+    return result
 
 
-@mcp.tool()
-def extract_urls(text: str) -> Dict[str, Any]:
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def extract_urls(
+    text: str = "",
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Extract all URLs from a given text.
     
     Args:
         text: Text to search for URLs
+        file_path: Server-local file to search instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, searched as if joined, instead of text
         
     Returns:
         List of found URLs.
     """
-    url_pattern = r'https?://[^\s<>"\'{}|\\^`\[\]]+'
-    urls = list(set(re.findall(url_pattern, text)))
+    try:
+        urls, limit_reached = _unique_matches(_URL_RE, text, file_path, chunks)
+    except Exception as e:
+        return {"error": str(e)}
     
     # Categorize URLs
     categorized = {
@@ -156,12 +392,15 @@ def extract_urls(text: str) -> Dict[str, Any]:
         else:
             categorized["http"].append(url)
     
-    return {
+    result = {
         "urls": urls,
         "count": len(urls),
         "secure_count": len(categorized["https"]),
         "insecure_count": len(categorized["http"])
     }
+    if limit_reached:
+        result["limit_reached"] = True
+    return result
 
 
 @mcp.tool()
@@ -175,9 +414,7 @@ def validate_email(email: str) -> Dict[str, Any]:
     Returns:
         Validation result with details.
     """
-    # Basic email pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    is_valid = bool(re.match(pattern, email))
+    is_valid = bool(_EMAIL_FULL_RE.match(email))
     
     result = {
         "email": email,
@@ -238,91 +475,268 @@ def generate_qr_data(
     }
 
 
-@mcp.tool()
-def extract_hashtags(text: str) -> Dict[str, Any]:
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def extract_hashtags(
+    text: str = "",
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Extract all hashtags from a given text.
     
     Args:
         text: Text to search for hashtags
+        file_path: Server-local file to search instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, searched as if joined, instead of text
         
     Returns:
         List of found hashtags.
     """
-    hashtag_pattern = r'#[a-zA-Z0-9_]+'
-    hashtags = list(set(re.findall(hashtag_pattern, text)))
+    try:
+        hashtags, limit_reached = _unique_matches(_HASHTAG_RE, text, file_path, chunks)
+    except Exception as e:
+        return {"error": str(e)}
     
-    return {
+    result = {
         "hashtags": hashtags,
         "count": len(hashtags),
         "without_symbol": [h[1:] for h in hashtags]
     }
+    if limit_reached:
+        result["limit_reached"] = True
+    return result
 
 
-@mcp.tool()
-def extract_mentions(text: str) -> Dict[str, Any]:
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def extract_mentions(
+    text: str = "",
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Extract all @mentions from a given text.
     
     Args:
         text: Text to search for mentions
+        file_path: Server-local file to search instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, searched as if joined, instead of text
         
     Returns:
         List of found mentions.
     """
-    mention_pattern = r'@[a-zA-Z0-9_]+'
-    mentions = list(set(re.findall(mention_pattern, text)))
+    try:
+        mentions, limit_reached = _unique_matches(_MENTION_RE, text, file_path, chunks)
+    except Exception as e:
+        return {"error": str(e)}
     
-    return {
+    result = {
         "mentions": mentions,
         "count": len(mentions),
         "usernames": [m[1:] for m in mentions]
     }
+    if limit_reached:
+        result["limit_reached"] = True
+    return result
+
+
+@mcp.tool(execution="process", min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES, offload_args=("file_path",))
+def extract_entities(
+    text: str = "",
+    types: List[Literal["urls", "emails", "hashtags", "mentions"]] = list(ENTITY_TYPES),
+    file_path: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Extract URLs, email addresses, #hashtags and @mentions from a text in a single pass.
+    
+    Use this instead of calling extract_urls, extract_emails, extract_hashtags and
+    extract_mentions one after another. Each part of the text counts as one entity only:
+    an email address is not also reported as an @mention, nor a URL's #fragment as a hashtag.
+    
+    Args:
+        text: Text to search
+        types: Entity types to return. Defaults to all four.
+        file_path: Server-local file to search instead, relative to TOOL_FILE_ROOT
+        chunks: Text in pieces, searched as if joined, instead of text
+        
+    Returns:
+        Unique entities per type in order of first appearance, with counts.
+    """
+    wanted = set(types) or set(ENTITY_TYPES)
+    try:
+        source = open_source(text, file_path, chunks)
+        # All types are scanned for even when fewer are wanted, so that an email
+        # address is never reported as a mention
+        if source is None:
+            found = {name: UniqueValues(sys.maxsize) for name in ENTITY_TYPES}
+            matches = _iter_entities(text)
+        else:
+            found = {name: UniqueValues(settings.TOOL_STREAM_MAX_RESULTS) for name in ENTITY_TYPES}
+            matches = scan_chunks(source, _iter_entities)
+        for _, _, (name, entity) in matches:
+            found[name].add(entity)
+    except Exception as e:
+        return {"error": str(e)}
+    
+    found = {name: values for name, values in found.items() if name in wanted}
+    result: Dict[str, Any] = {name: list(values.values) for name, values in found.items()}
+    result["counts"] = {name: len(values.values) for name, values in found.items()}
+    result["total"] = sum(result["counts"].values())
+    if any(values.limit_reached for values in found.values()):
+        result["limit_reached"] = True
+    return result
+
+
+def _domain_analysis(parts: DomainParts) -> Dict[str, Any]:
+    """analyze_domain's result for a hostname split at its public suffix."""
+    labels = [parts.hostname] if parts.is_ip else parts.hostname.split(".")
+    return {
+        "full_domain": parts.hostname,
+        "parts": labels,
+        "is_ip": parts.is_ip,
+        "tld": None if parts.is_ip else labels[-1],
+        "public_suffix": parts.public_suffix,
+        "known_suffix": parts.known_suffix,
+        "private_suffix": parts.private_suffix,
+        "registrable_domain": parts.registrable_domain,
+        "domain_name": parts.registrable_domain.split(".", 1)[0] if parts.registrable_domain else None,
+        "subdomain": parts.subdomain,
+        "is_subdomain": parts.subdomain is not None
+    }
 
 
 @mcp.tool()
+@memoize
 def analyze_domain(domain: str) -> Dict[str, Any]:
     """
     Analyze a domain name and extract information about it.
     
+    Suffixes are looked up in the Public Suffix List, so multi-label ones such as
+    "co.uk" or "github.io" are told apart from the registrable domain.
+    
     Args:
-        domain: Domain name to analyze (e.g., "www.example.co.uk")
+        domain: Domain name to analyze (e.g., "www.example.co.uk"); a URL works too
         
     Returns:
-        Domain analysis including TLD, subdomain, etc.
+        Domain analysis including TLD, public suffix, registrable domain and subdomain.
     """
-    # Remove protocol if present
-    domain = re.sub(r'^https?://', '', domain)
-    # Remove path if present
-    domain = domain.split('/')[0]
-    
-    parts = domain.split('.')
-    
-    # Common TLDs including country codes
-    common_tlds = ['com', 'org', 'net', 'edu', 'gov', 'io', 'co', 'app', 'dev']
+    try:
+        return _domain_analysis(get_psl().split(domain))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# Columns of analyze_domains' result, in order
+_DOMAIN_COLUMNS = ("public_suffix", "registrable_domain", "subdomain", "known_suffix", "private_suffix", "is_ip")
+
+# Distinct hostnames whose split is reused within one analyze_domains call
+_DOMAIN_CACHE_ENTRIES = 100000
+
+# Errors listed for file input; the rest are only counted
+_MAX_FILE_ERRORS = 100
+
+
+@mcp.tool(
+    execution="process",
+    min_offload_bytes=settings.TOOL_OFFLOAD_MIN_BYTES,
+    offload_args=("file_path",),
+    max_output_bytes=0
+)
+def analyze_domains(
+    domains: List[str] = [],
+    file_path: Optional[str] = None,
+    include_columns: bool = True,
+    top: int = 20
+) -> Dict[str, Any]:
+    """
+    Classify many hostnames at once by public suffix and registrable domain.
     
-    result = {
-        "full_domain": domain,
-        "parts": parts,
-        "is_subdomain": len(parts) > 2
-    }
+    For a list, results are columnar: each column holds one value per input hostname,
+    in input order, with null for entries that are not valid hostnames (listed in errors).
+    A file is only summarized, so it can hold millions of hostnames.
     
-    if len(parts) >= 2:
-        result["tld"] = parts[-1]
-        result["domain_name"] = parts[-2]
+    Args:
+        domains: Hostnames or URLs to classify
+        file_path: Server-local file with one hostname or URL per line, relative to TOOL_FILE_ROOT
+        include_columns: Return per-hostname columns (list input only)
+        top: Number of most frequent registrable domains and suffixes to return
         
-        if len(parts) > 2:
-            result["subdomain"] = '.'.join(parts[:-2])
-    
-    # Check if it might be a two-part TLD (like .co.uk)
-    if len(parts) >= 3 and parts[-2] in ['co', 'com', 'net', 'org', 'gov', 'ac', 'edu']:
-        result["possible_ccTLD"] = f"{parts[-2]}.{parts[-1]}"
+    Returns:
+        Per-hostname columns, the most frequent registrable domains and suffixes, and counts.
+    """
+    try:
+        if domains and file_path is not None:
+            raise ValueError("Give either domains or file_path, not both")
+        if len(domains) > settings.TOOL_BULK_MAX_ITEMS:
+            raise ValueError(f"At most {settings.TOOL_BULK_MAX_ITEMS} domains are allowed per call")
+        source = open_source(file_path=file_path)
+        values = domains if source is None else (line.strip() for line in iter_lines(source))
+        
+        psl = get_psl()
+        keep_columns = include_columns and source is None
+        columns: Dict[str, List[Any]] = {name: [] for name in _DOMAIN_COLUMNS}
+        errors: List[Dict[str, Any]] = []
+        registrable_counts: Counter = Counter()
+        suffix_counts: Counter = Counter()
+        count = ip_count = unknown_count = error_count = 0
+        cache: Dict[str, Any] = {}
+        for index, value in enumerate(values):
+            if source is not None and not value:
+                continue
+            count += 1
+            parts = cache.get(value)
+            if parts is None:
+                try:
+                    parts = psl.split(value)
+                except Exception as e:
+                    parts = e
+                if len(cache) < _DOMAIN_CACHE_ENTRIES:
+                    cache[value] = parts
+            if isinstance(parts, Exception):
+                error_count += 1
+                if source is None:
+                    errors.append({"index": index, "domain": value, "error": str(parts)})
+                elif len(errors) < _MAX_FILE_ERRORS:
+                    errors.append({"line": index + 1, "domain": value[:200], "error": str(parts)})
+                if keep_columns:
+                    for column in columns.values():
+                        column.append(None)
+                continue
+            if parts.is_ip:
+                ip_count += 1
+            else:
+                suffix_counts[parts.public_suffix] += 1
+                if not parts.known_suffix:
+                    unknown_count += 1
+                if parts.registrable_domain:
+                    registrable_counts[parts.registrable_domain] += 1
+            if keep_columns:
+                for name, column in columns.items():
+                    column.append(getattr(parts, name))
+    except Exception as e:
+        return {"error": str(e)}
     
+    result: Dict[str, Any] = {"count": count}
+    if keep_columns:
+        result["columns"] = columns
+    result.update({
+        "top_registrable_domains": [
+            {"domain": domain, "count": hits} for domain, hits in registrable_counts.most_common(max(0, top))
+        ],
+        "top_public_suffixes": [
+            {"suffix": suffix, "count": hits} for suffix, hits in suffix_counts.most_common(max(0, top))
+        ],
+        "registrable_domain_count": len(registrable_counts),
+        "ip_count": ip_count,
+        "unknown_suffix_count": unknown_count,
+        "errors": errors,
+        "error_count": error_count
+    })
     return result
 
 
 @mcp.tool()
-def slugify(text: str, separator: str = "-") -> Dict[str, str]:
+def slugify(text: str, separator: str = "-") -> Dict[str, Any]:
     """
     Convert text to a URL-friendly slug.
     
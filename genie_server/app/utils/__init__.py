@@ -1,4 +1,22 @@
 """Utils package for GENIE Server."""
-from app.utils.serialization import bson_to_json
+from app.utils.budget import apply_output_budget, json_size
+from app.utils.memoize import memo_stats, memoize
+from app.utils.metrics import MetricsRegistry, metrics
 
-__all__ = ["bson_to_json"]
+__all__ = [
+    "apply_output_budget",
+    "bson_to_json",
+    "json_size",
+    "memo_stats",
+    "memoize",
+    "MetricsRegistry",
+    "metrics",
+]
+
+
+def __getattr__(name: str):
+    # Serialization pulls in bson, so it is only imported when first used
+    if name == "bson_to_json":
+        from app.utils.serialization import bson_to_json
+        return bson_to_json
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,86 @@
+"""
+Output-size budgets for tool results.
+
+A tool result over its budget is cut down field by field, largest first:
+lists keep their leading items and strings their leading characters. The
+result then carries "truncated": true and, per trimmed field, the total and
+returned lengths, so the client knows to ask for less (a narrower query, a
+smaller limit) instead of silently working on partial data. A "truncated"
+field the tool returns itself, as aggregate_data does, is set to true too.
+"""
+from typing import Any, Dict, Optional
+
+import pydantic_core
+
+# Room left for the truncation metadata itself
+_METADATA_BYTES = 256
+
+# Keys added to a trimmed result
+TRUNCATION_KEYS = ("truncated", "truncation")
+
+
+def to_json(value: Any) -> bytes:
+    """Serialize a value as compact JSON."""
+    return pydantic_core.to_json(value, fallback=str)
+
+
+def json_size(value: Any) -> int:
+    """Size in bytes of a value serialized as JSON."""
+    return len(to_json(value))
+
+
+def _fit_field(value: Any, size: int, max_bytes: int) -> Any:
+    """Long prefix of a list or string (of JSON size size) that fits max_bytes."""
+    keep = len(value)
+    # Shrink in proportion to the overshoot; a few rounds settle it because
+    # items of one field are usually of similar size
+    while keep and size > max_bytes:
+        keep = max(0, min(keep - 1, int(keep * max_bytes / size * 0.95)))
+        size = json_size(value[:keep])
+    return value[:keep]
+
+
+def apply_output_budget(result: Any, max_bytes: int, size: Optional[int] = None) -> Any:
+    """
+    Trim a tool result to fit an output-size budget.
+    
+    Only dict results are trimmed, and only their top-level list and string
+    fields; the original result is not modified.
+    
+    Args:
+        result: The tool's return value.
+        max_bytes: Budget for the serialized result. 0 disables the budget.
+        size: Serialized size of the result, if already known.
+        
+    Returns:
+        The result, or a trimmed copy with truncation metadata (see
+        TRUNCATION_KEYS) if any field was trimmed.
+    """
+    if not max_bytes or not isinstance(result, dict):
+        return result
+    size = json_size(result) if size is None else size
+    if size <= max_bytes:
+        return result
+    
+    trimmed = dict(result)
+    truncation: Dict[str, Dict[str, int]] = {}
+    field_sizes = {
+        key: json_size(value)
+        for key, value in trimmed.items()
+        if isinstance(value, (list, str)) and value
+    }
+    for key in sorted(field_sizes, key=field_sizes.get, reverse=True):
+        if size <= max_bytes:
+            break
+        # Budget left for this field once everything else is accounted for
+        allowance = max(0, max_bytes - (size - field_sizes[key]) - _METADATA_BYTES)
+        value = _fit_field(trimmed[key], field_sizes[key], allowance)
+        truncation[key] = {"total": len(trimmed[key]), "returned": len(value)}
+        trimmed[key] = value
+        size = size - field_sizes[key] + json_size(value)
+    
+    if not truncation:
+        return result
+    trimmed["truncated"] = True
+    trimmed["truncation"] = truncation
+    return trimmed
@@ -0,0 +1,200 @@
+"""
+Memoization for deterministic tools.
+
+Many tools are pure functions of their arguments, and agents tend to call
+them again with the same inputs. memoize() keeps their recent results in a
+bounded LRU, limited both by entry count and by the JSON size of the cached
+results. Keys are a canonical form of the arguments, so keyword order and
+omitted defaults do not split the cache.
+
+Cached results are shared between calls and must not be mutated.
+Per-tool hit, miss and eviction counters are exported as metrics.
+"""
+import functools
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.budget import json_size
+from app.utils.metrics import metrics
+
+
+def canonical_key(signature: inspect.Signature, args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """
+    Canonical, hashable form of a call's arguments, with defaults applied.
+    
+    FastMCP passes every parameter by keyword, already validated; those calls
+    with hashable values are keyed on the sorted items directly. Anything else
+    (positional calls, dict or list arguments) is bound to the signature and
+    keyed on its canonical JSON.
+    
+    Raises:
+        TypeError: If the arguments do not match the signature.
+    """
+    if not args and len(kwargs) == len(signature.parameters):
+        key = tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            pass
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+class ToolMemo:
+    """
+    Bounded LRU of results for one tool.
+    
+    Guarded by a lock, since thread-offloaded tools call it from pool threads.
+    """
+    
+    def __init__(self, name: str, max_entries: int, max_bytes: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (size, result); most recently used last
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, result) and count the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+    
+    def put(self, key: Hashable, result: Any) -> None:
+        """Cache a result, evicting the least recently used ones to stay in bounds."""
+        size = json_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[0]
+            self._entries[key] = (size, result)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Memoized tools by function name, for metrics
+_memos: Dict[str, ToolMemo] = {}
+
+
+def memoize(
+    fn: Optional[Callable[..., Any]] = None,
+    *,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> Any:
+    """
+    Cache a deterministic synchronous tool's results by argument value.
+    
+    Apply below @mcp.tool(), so the registered tool is the memoized one::
+    
+        @mcp.tool()
+        @memoize
+        def convert_length(...): ...
+        
+    The wrapper keeps the function's name, signature and docstring, and the
+    uncached function stays reachable as __wrapped__.
+    
+    Args:
+        fn: The tool function (when used without arguments).
+        max_entries: Max cached results. Defaults to TOOL_MEMO_MAX_ENTRIES.
+        max_bytes: Max total JSON size of cached results.
+            Defaults to TOOL_MEMO_MAX_BYTES.
+            
+    Returns:
+        The memoized function, or a decorator when called with arguments only.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            raise ValueError(f"Tool {fn.__name__} is async; only synchronous tools can be memoized")
+        
+        signature = inspect.signature(fn)
+        memo = ToolMemo(
+            fn.__name__,
+            settings.TOOL_MEMO_MAX_ENTRIES if max_entries is None else max_entries,
+            settings.TOOL_MEMO_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        _memos[fn.__name__] = memo
+        
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not memo.max_entries:
+                return fn(*args, **kwargs)
+            key = canonical_key(signature, args, kwargs)
+            found, result = memo.get(key)
+            if found:
+                return result
+            result = fn(*args, **kwargs)
+            memo.put(key, result)
+            return result
+        
+        wrapper.memo = memo
+        return wrapper
+    
+    return decorator(fn) if fn is not None else decorator
+
+
+def memo_stats() -> Dict[str, Dict[str, Any]]:
+    """Cache statistics per memoized tool."""
+    return {name: memo.stats() for name, memo in sorted(_memos.items())}
+
+
+def _collect_metrics() -> Iterable[str]:
+    """Prometheus lines for memoized tool caches."""
+    memos = sorted(_memos.items())
+    series = (
+        ("genie_tool_memo_hits_total", "counter", "Calls answered from the memo cache.", "hits"),
+        ("genie_tool_memo_misses_total", "counter", "Calls that ran the tool and cached the result.", "misses"),
+        ("genie_tool_memo_evictions_total", "counter", "Results evicted to stay within bounds.", "evictions"),
+        ("genie_tool_memo_bytes", "gauge", "JSON size of cached results.", "bytes"),
+    )
+    lines: List[str] = []
+    for metric, kind, help_text, attribute in series:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{tool="{name}"}} {getattr(memo, attribute)}' for name, memo in memos]
+    lines += ["# HELP genie_tool_memo_entries Cached results.", "# TYPE genie_tool_memo_entries gauge"]
+    lines += [f'genie_tool_memo_entries{{tool="{name}"}} {len(memo._entries)}' for name, memo in memos]
+    return lines
+
+
+metrics.register_collector(_collect_metrics)
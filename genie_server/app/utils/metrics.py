@@ -0,0 +1,151 @@
+"""
+In-process metrics for GENIE Server, rendered in the Prometheus text format.
+
+Per-tool call counts, error counts and latency/size histograms are recorded by
+the MCP server on every tool call. Other components can contribute their own
+series through register_collector().
+
+Metrics are updated from the server's event loop only and need no locking.
+"""
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence
+
+# Seconds; tools range from microsecond string helpers to multi-second queries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes of JSON
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with a running sum and count.
+    """
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def render(self, name: str, labels: str) -> List[str]:
+        """Render the _bucket, _sum and _count samples of this histogram."""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class ToolMetrics:
+    """
+    Metrics recorded for a single tool.
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.input_bytes = Histogram(SIZE_BUCKETS)
+        self.output_bytes = Histogram(SIZE_BUCKETS)
+
+
+class MetricsRegistry:
+    """
+    Registry of per-tool metrics and additional collectors.
+    """
+    
+    def __init__(self):
+        self._tools: Dict[str, ToolMetrics] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+    
+    def observe_tool_call(
+        self,
+        tool: str,
+        seconds: float,
+        input_bytes: int,
+        output_bytes: int,
+        error: bool
+    ) -> None:
+        """
+        Record one completed tool call.
+        
+        Args:
+            tool: Tool name.
+            seconds: Wall-clock duration of the call.
+            input_bytes: Size of the JSON arguments.
+            output_bytes: Size of the JSON result (0 if the call raised).
+            error: Whether the call raised or returned an error result.
+        """
+        tool_metrics = self._tools.get(tool)
+        if tool_metrics is None:
+            tool_metrics = self._tools[tool] = ToolMetrics()
+        tool_metrics.calls += 1
+        if error:
+            tool_metrics.errors += 1
+        tool_metrics.latency.observe(seconds)
+        tool_metrics.input_bytes.observe(input_bytes)
+        tool_metrics.output_bytes.observe(output_bytes)
+    
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """
+        Add a callable that returns extra Prometheus text lines (with HELP/TYPE).
+        """
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        tools = sorted(self._tools.items())
+        lines = [
+            "# HELP genie_tool_calls_total Tool calls handled.",
+            "# TYPE genie_tool_calls_total counter",
+        ]
+        lines += [f'genie_tool_calls_total{{tool="{_escape(name)}"}} {m.calls}' for name, m in tools]
+        lines += [
+            "# HELP genie_tool_errors_total Tool calls that raised or returned an error.",
+            "# TYPE genie_tool_errors_total counter",
+        ]
+        lines += [f'genie_tool_errors_total{{tool="{_escape(name)}"}} {m.errors}' for name, m in tools]
+        
+        histograms = (
+            ("genie_tool_duration_seconds", "Tool call latency in seconds.", "latency"),
+            ("genie_tool_input_bytes", "Size of tool arguments as JSON.", "input_bytes"),
+            ("genie_tool_output_bytes", "Size of tool results as JSON.", "output_bytes"),
+        )
+        for metric, help_text, attribute in histograms:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for name, m in tools:
+                lines += getattr(m, attribute).render(metric, f'tool="{_escape(name)}"')
+        
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for the server
+metrics = MetricsRegistry()
@@ -0,0 +1,239 @@
+"""
+Public Suffix List lookups.
+
+The Public Suffix List (https://publicsuffix.org) names the suffixes under
+which anyone can register a domain: "com" and "co.uk", but also private ones
+such as "github.io". It is what tells "bbc.co.uk" (registrable) apart from
+"co.uk" (a suffix).
+
+The rules are loaded once, on first use, from the snapshot bundled at
+app/data/public_suffix_list.dat into a trie of labels read right to left, so
+a lookup visits one node per label of the hostname. Leaf nodes (most rules)
+are shared, which keeps the trie small. To update the snapshot, replace the
+file with https://publicsuffix.org/list/public_suffix_list.dat.
+"""
+import ipaddress
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+PSL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "public_suffix_list.dat")
+
+# Trie keys that cannot be labels: the kind of rule ending at a node, and the
+# exception rules below it ("!www.ck" is stored under "ck" as {"!": {"www": kind}})
+_RULE = "."
+_EXCEPTION = "!"
+_WILDCARD = "*"
+
+# Characters that only occur in URLs or host:port forms, not in plain hostnames
+_URL_CHARS = re.compile(r"[/:@?#\[\s]")
+
+ICANN = 1
+PRIVATE = 2
+
+# Shared leaf nodes, one per rule kind
+_LEAVES = {ICANN: {_RULE: ICANN}, PRIVATE: {_RULE: PRIVATE}}
+
+
+class DomainParts(NamedTuple):
+    """A hostname split at its public suffix."""
+    hostname: str
+    public_suffix: Optional[str]
+    registrable_domain: Optional[str]
+    subdomain: Optional[str]
+    # Whether the suffix is listed (otherwise the last label is assumed to be one)
+    known_suffix: bool
+    # Whether the suffix comes from the private section, e.g. "github.io"
+    private_suffix: bool
+    is_ip: bool = False
+
+
+def _punycode(label: str) -> Optional[str]:
+    """ASCII ("xn--") form of a non-ASCII label, as hostnames appear in logs."""
+    if label.isascii():
+        return None
+    try:
+        return "xn--" + label.encode("punycode").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+def normalize_hostname(value: str) -> str:
+    """
+    Hostname of a domain, URL or host:port, lowercased and without a trailing dot.
+    """
+    if not _URL_CHARS.search(value):
+        return value.rstrip(".").lower()
+    host = value.strip()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    host = host.rsplit("@", 1)[-1]
+    if host.startswith("["):
+        # Bracketed IPv6 literal, possibly with a port
+        return host[1:].split("]", 1)[0].lower()
+    if host.count(":") == 1:
+        host = host.split(":", 1)[0]
+    return host.rstrip(".").lower()
+
+
+def _is_ip(host: str) -> bool:
+    """Whether a hostname is an IPv4 or IPv6 address."""
+    if not host or not (host[0].isdigit() or ":" in host):
+        return False
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class PublicSuffixList:
+    """
+    Label trie of Public Suffix List rules.
+    
+    Lookups are thread-safe; the trie is not modified after construction.
+    """
+    
+    def __init__(self, lines: Iterable[str]):
+        self._root: Dict[str, Any] = {}
+        self.rule_count = 0
+        kind = ICANN
+        for line in lines:
+            line = line.strip()
+            if line.startswith("//"):
+                if "===BEGIN PRIVATE DOMAINS===" in line:
+                    kind = PRIVATE
+                continue
+            # A rule ends at the first whitespace
+            rule = line.split()[0].lower() if line else ""
+            if rule:
+                self._add(rule, kind)
+        self._root = self._compact(self._root)
+    
+    @classmethod
+    def load(cls, path: str = PSL_PATH) -> "PublicSuffixList":
+        """Build the trie from a public_suffix_list.dat file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(f)
+    
+    def _add(self, rule: str, kind: int) -> None:
+        """Insert one rule, and its punycode form if it has non-ASCII labels."""
+        exception = rule.startswith(_EXCEPTION)
+        labels = rule.lstrip(_EXCEPTION).split(".")
+        ascii_labels = [_punycode(label) or label for label in labels]
+        for variant in {tuple(labels), tuple(ascii_labels)}:
+            node = self._root
+            first, *parents = variant
+            for label in reversed(parents):
+                node = node.setdefault(sys.intern(label), {})
+            if exception:
+                node.setdefault(_EXCEPTION, {})[sys.intern(first)] = kind
+            else:
+                node.setdefault(sys.intern(first), {})[_RULE] = kind
+        self.rule_count += 1
+    
+    def _compact(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace leaf nodes by the shared ones."""
+        if len(node) == 1 and _RULE in node:
+            return _LEAVES[node[_RULE]]
+        for label, child in node.items():
+            if label not in (_RULE, _EXCEPTION):
+                node[label] = self._compact(child)
+        return node
+    
+    def suffix_length(self, labels: List[str]) -> Tuple[int, int]:
+        """
+        Labels in the public suffix of a hostname, and the kind of its rule.
+        
+        Args:
+            labels: The hostname's labels, left to right.
+            
+        Returns:
+            (length, kind), with kind 0 when no rule matched and the last
+            label is taken as the suffix (the list's implicit "*" rule).
+        """
+        # Most paths have no wildcard or exception rules and follow a single node
+        best, best_kind = 1, 0
+        node = self._root
+        depth = 0
+        for label in reversed(labels):
+            if _WILDCARD in node or _EXCEPTION in node:
+                return self._wildcard_suffix_length(labels)
+            node = node.get(label)
+            if node is None:
+                break
+            depth += 1
+            kind = node.get(_RULE)
+            if kind:
+                best, best_kind = depth, kind
+        return best, best_kind
+    
+    def _wildcard_suffix_length(self, labels: List[str]) -> Tuple[int, int]:
+        """suffix_length() following every matching rule, for wildcard and exception rules."""
+        best, best_kind = 1, 0
+        frontier = [self._root]
+        depth = 0
+        for label in reversed(labels):
+            depth += 1
+            matched = []
+            for node in frontier:
+                # An exception rule overrides every other rule; its suffix is
+                # the rule without its first label
+                exceptions = node.get(_EXCEPTION)
+                if exceptions and label in exceptions:
+                    return depth - 1, exceptions[label]
+                for child in (node.get(label), node.get(_WILDCARD)):
+                    if child is not None:
+                        matched.append(child)
+                        kind = child.get(_RULE)
+                        if kind and (depth > best or not best_kind):
+                            best, best_kind = depth, kind
+            if not matched:
+                break
+            frontier = matched
+        return best, best_kind
+    
+    def split(self, value: str) -> DomainParts:
+        """
+        Split a hostname (or URL) into subdomain, registrable domain and public suffix.
+        
+        Args:
+            value: Hostname, URL or host:port, e.g. "www.bbc.co.uk".
+            
+        Returns:
+            The parts. The registrable domain is None when the hostname is
+            itself a public suffix; all parts are None for IP addresses.
+        """
+        host = normalize_hostname(value)
+        if _is_ip(host):
+            return DomainParts(host, None, None, None, False, False, True)
+        labels = host.split(".")
+        if not host or "" in labels:
+            raise ValueError(f"Invalid hostname: {value!r}")
+        length, kind = self.suffix_length(labels)
+        if len(labels) <= length:
+            return DomainParts(host, host, None, None, kind != 0, kind == PRIVATE)
+        # Slice the hostname instead of joining labels back together
+        extra = len(labels) - length - 1
+        subdomain = ".".join(labels[:extra]) if extra else None
+        registrable = host[len(subdomain) + 1:] if subdomain else host
+        suffix = registrable[len(labels[extra]) + 1:]
+        return DomainParts(host, suffix, registrable, subdomain, kind != 0, kind == PRIVATE)
+
+
+_psl: Optional[PublicSuffixList] = None
+_psl_lock = threading.Lock()
+
+
+def get_psl() -> PublicSuffixList:
+    """The bundled Public Suffix List, loaded on first use."""
+    global _psl
+    
+    if _psl is None:
+        with _psl_lock:
+            if _psl is None:
+                _psl = PublicSuffixList.load()
+    return _psl
@@ -4,22 +4,75 @@ Serialization utilities for GENIE Server.
 Provides helper functions for data conversion and serialization.
 """
 import json
+import math
+from datetime import datetime
 from typing import Any, Dict, List, Union
 
-from bson import json_util
+import bson
+from bson import ObjectId, json_util
+from bson.raw_bson import RawBSONDocument
 
+# Same output format as json_util.dumps() with its defaults (relaxed Extended JSON)
+_JSON_OPTIONS = json_util.DEFAULT_JSON_OPTIONS
+_EPOCH = datetime(1970, 1, 1)
 
-def bson_to_json(data: Union[Dict, List]) -> Union[Dict, List]:
+
+def _convert_key(key: Any) -> str:
+    """Convert a mapping key the way json.dumps does (BSON keys are always str)."""
+    return key if type(key) is str else json.dumps(key)
+
+
+def _convert(obj: Any) -> Any:
+    """
+    Recursively convert one BSON value to its JSON-compatible equivalent.
+    
+    The common types are handled inline; everything else goes through
+    json_util.default() so the output matches json_util exactly.
+    """
+    t = type(obj)
+    if t is str or t is int or t is bool or obj is None:
+        return obj
+    if t is dict:
+        return {k if type(k) is str else _convert_key(k): _convert(v) for k, v in obj.items()}
+    if t is list or t is tuple:
+        return [_convert(v) for v in obj]
+    if t is float:
+        return obj if math.isfinite(obj) else json_util.default(obj, _JSON_OPTIONS)
+    if t is ObjectId:
+        return {"$oid": str(obj)}
+    if t is datetime and obj.tzinfo is None and obj >= _EPOCH:
+        # Naive datetimes are UTC; matches json_util's ISO-8601 formatting
+        millis = obj.microsecond // 1000
+        fraction = ".%03d" % millis if millis else ""
+        return {"$date": f"{obj.isoformat(timespec='seconds')}{fraction}Z"}
+    if t is RawBSONDocument:
+        # One C-level decode of the raw bytes, then a single conversion pass
+        return _convert(bson.decode(obj.raw))
+    if hasattr(obj, "items"):
+        return {_convert_key(k): _convert(v) for k, v in obj.items()}
+    try:
+        return json_util.default(obj, _JSON_OPTIONS)
+    except TypeError:
+        pass
+    if hasattr(obj, "__iter__") and not isinstance(obj, (str, bytes)):
+        return [_convert(v) for v in obj]
+    return obj
+
+
+def bson_to_json(data: Union[Dict, List, RawBSONDocument]) -> Union[Dict, List]:
     """
     Convert BSON data to JSON-serializable format.
     
+    Produces the same result as json.loads(json_util.dumps(data)) in a single
+    pass, without building and re-parsing an intermediate JSON string.
+    
     Args:
-        data: BSON data (dict or list of dicts).
+        data: BSON data (dict, RawBSONDocument, or list of them).
         
     Returns:
         JSON-serializable data.
     """
-    return json.loads(json_util.dumps(data))
+    return _convert(data)
 
 
 def safe_json_dumps(data: Any) -> str:
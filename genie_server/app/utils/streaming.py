@@ -0,0 +1,197 @@
+"""
+Streaming input for text-scanning tools.
+
+Besides a text argument, which has to travel in the request, scanning tools
+can read a server-local file (under TOOL_FILE_ROOT) or a list of chunks.
+Files are memory-mapped and decoded one chunk at a time, so memory use is
+bounded by the chunk size, not the file size.
+
+scan_chunks() runs a scanner over the chunks and finds the same matches as
+one scan of the joined text: a match that might continue into the next chunk
+is carried over and scanned again with it. Matches longer than OVERLAP_CHARS
+are the exception; they may be cut at a chunk boundary.
+"""
+import codecs
+import mmap
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+# A scanner yields (start, end, item) for each match in text, from position pos on
+Scanner = Callable[[str, int], Iterable[Tuple[int, int, T]]]
+
+# Longest match that is always found whole across chunk boundaries
+OVERLAP_CHARS = 8192
+
+# Text kept before a chunk boundary for anchors and lookbehinds (^, \b, (?<=...))
+CONTEXT_CHARS = 256
+
+
+def resolve_file(file_path: str) -> str:
+    """
+    Resolve a file path against TOOL_FILE_ROOT.
+    
+    Raises:
+        ValueError: If file input is disabled, or the path is not a file inside the root.
+    """
+    if not settings.TOOL_FILE_ROOT:
+        raise ValueError("File input is disabled; set TOOL_FILE_ROOT to a directory to allow it")
+    root = os.path.realpath(settings.TOOL_FILE_ROOT)
+    # realpath resolves symlinks and "..", so the check sees where the path really leads
+    path = os.path.realpath(os.path.join(root, file_path))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"File path must be inside TOOL_FILE_ROOT: {file_path}")
+    if not os.path.isfile(path):
+        raise ValueError(f"File not found: {file_path}")
+    return path
+
+
+def iter_file_chunks(path: str, chunk_bytes: int) -> Iterator[str]:
+    """
+    Memory-map a file and yield its text one chunk at a time.
+    
+    The file is decoded as UTF-8; a character split between chunks is kept
+    whole, and invalid bytes become U+FFFD.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, len(mapped), chunk_bytes):
+                end = min(offset + chunk_bytes, len(mapped))
+                text = decoder.decode(mapped[offset:end])
+                # Drop the pages already read, so resident memory stays at
+                # about one chunk however large the file is
+                if hasattr(mmap, "MADV_DONTNEED"):
+                    start = offset - offset % mmap.PAGESIZE
+                    mapped.madvise(mmap.MADV_DONTNEED, start, end - start)
+                yield text
+    yield decoder.decode(b"", final=True)
+
+
+def open_source(text: str = "", file_path: Optional[str] = None,
+                chunks: Optional[List[str]] = None) -> Optional[Iterable[str]]:
+    """
+    Chunks of a tool's input when it comes from a file or a chunk list.
+    
+    Args:
+        text: Text argument of the tool.
+        file_path: File path argument, relative to TOOL_FILE_ROOT.
+        chunks: Chunk list argument.
+        
+    Returns:
+        The chunks, or None when the input is the text argument.
+        
+    Raises:
+        ValueError: If more than one input was given, or the file cannot be read.
+    """
+    if file_path is None and chunks is None:
+        return None
+    given = [name for name, value in (("text", text or None), ("file_path", file_path), ("chunks", chunks))
+             if value is not None]
+    if len(given) > 1:
+        raise ValueError(f"Give only one of text, file_path or chunks, not {' and '.join(given)}")
+    if file_path is not None:
+        return iter_file_chunks(resolve_file(file_path), max(1, settings.TOOL_STREAM_CHUNK_BYTES))
+    return chunks
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Lines of a chunked text, without line breaks; a line split between chunks is joined."""
+    partial = ""
+    for chunk in chunks:
+        lines = (partial + chunk).split("\n")
+        partial = lines.pop()
+        yield from lines
+    if partial:
+        yield partial
+
+
+def regex_scanner(pattern: re.Pattern) -> Scanner:
+    """Scanner yielding the match objects of a compiled pattern."""
+    def scan(text: str, pos: int) -> Iterator[Tuple[int, int, re.Match]]:
+        for match in pattern.finditer(text, pos):
+            yield match.start(), match.end(), match
+    return scan
+
+
+def scan_chunks(chunks: Iterable[str], scanner: Scanner, overlap: int = OVERLAP_CHARS) -> Iterator[Tuple[int, int, T]]:
+    """
+    Run a scanner over a stream of chunks as if over their concatenation.
+    
+    Text within overlap characters of the end of what has been read so far
+    is rescanned with the next chunk, since more text could still extend a
+    match there or complete a new one.
+    
+    Args:
+        chunks: Text pieces, in order.
+        scanner: Finds matches in a text from a position on, see Scanner.
+        overlap: Longest match guaranteed to be found whole.
+        
+    Yields:
+        (start, end, item) per match, with offsets into the whole stream.
+    """
+    carry = ""
+    context = 0  # Leading characters of carry that were already scanned
+    base = 0  # Stream offset of carry[0]
+    emitted = 0  # Stream offset of the end of the last match yielded
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer = carry + chunk
+        limit = len(buffer) - overlap
+        if limit <= context:
+            carry = buffer
+            continue
+        resume = limit
+        for start, end, item in scanner(buffer, context):
+            # Matches already longer than the overlap are taken as they are,
+            # which keeps the carried text bounded
+            if end < limit or start < limit - overlap:
+                yield base + start, base + end, item
+                emitted = base + end
+                resume = max(resume, end)
+            else:
+                # A longer match may still appear anywhere past limit,
+                # even before this one, but not inside a match already
+                # yielded (one longer than the overlap can end past limit)
+                resume = max(emitted - base, min(start, limit))
+                break
+        keep = min(CONTEXT_CHARS, resume)
+        carry = buffer[resume - keep:]
+        base += resume - keep
+        context = keep
+    for start, end, item in scanner(carry, context):
+        yield base + start, base + end, item
+
+
+class UniqueValues:
+    """
+    Distinct values in first-seen order, up to a limit.
+    
+    Values beyond the limit are dropped, but still counted as occurrences.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.values: Dict[str, None] = {}
+        self.occurrences = 0
+        self.limit_reached = False
+    
+    def add(self, value: str) -> None:
+        """Record one occurrence of a value."""
+        self.occurrences += 1
+        if value in self.values:
+            return
+        if len(self.values) < self.limit:
+            self.values[value] = None
+        else:
+            self.limit_reached = True
@@ -0,0 +1,146 @@
+"""
+Streaming text statistics for word_count.
+
+TextStats is fed the text in chunks and keeps only running counts, plus the
+tail of the last chunk: the text is cut into pieces at the start of a
+whitespace run, so no word, run of sentence-ending punctuation or
+paragraph break ("\n\n") straddles two pieces. A piece without any
+whitespace is counted at once instead, as part of a word that continues.
+Each piece is counted with C-level string methods while it is small enough
+to stay in cache, instead of making several full-size copies of the whole
+text.
+
+The counts match the original word_count exactly: words are runs of
+non-whitespace, sentences are the non-blank segments between runs of ".",
+"!" and "?", and paragraphs are the non-blank segments between "\n\n".
+"""
+import re
+from typing import Any, Dict, List
+
+# Text is counted in pieces of about this many characters
+PIECE_CHARS = 65536
+
+_SENTENCE_END_RE = re.compile(r"[.!?]+")
+
+
+def _has_content(segment: str) -> bool:
+    """Whether a segment has any non-whitespace character."""
+    return bool(segment) and not segment.isspace()
+
+
+class _SegmentCounter:
+    """
+    Count non-blank segments between separators across pieces.
+    
+    A segment that continues from the previous piece is counted once.
+    """
+    
+    def __init__(self) -> None:
+        self.count = 0
+        # Whether the segment still open at the end of the last piece had content
+        self._open = False
+    
+    def add(self, segments: List[str]) -> None:
+        """Count the segments of one piece, split at the separator."""
+        self.count += sum(1 for segment in segments if _has_content(segment))
+        if self._open and _has_content(segments[0]):
+            self.count -= 1
+        if _has_content(segments[-1]):
+            self._open = True
+        elif len(segments) > 1:
+            self._open = False
+
+
+class TextStats:
+    """
+    Word, sentence and paragraph counts of a text fed in chunks.
+    
+    Memory use is bounded by the chunk size plus the longest whitespace run.
+    """
+    
+    def __init__(self) -> None:
+        self.characters = 0
+        # Characters other than spaces and newlines (as word_count has always counted them)
+        self.characters_no_spaces = 0
+        self.words = 0
+        # Non-whitespace characters, i.e. the total length of all words
+        self.word_characters = 0
+        self._sentences = _SegmentCounter()
+        self._paragraphs = _SegmentCounter()
+        # Text held back since the last cut, in pieces: joining it once, when
+        # a cut shows up, keeps long whitespace runs linear
+        self._carry: List[str] = []
+        # Whether the text counted so far ends in the middle of a word
+        self._mid_word = False
+    
+    @property
+    def sentences(self) -> int:
+        """Sentences counted so far."""
+        return self._sentences.count
+    
+    @property
+    def paragraphs(self) -> int:
+        """Paragraphs counted so far."""
+        return self._paragraphs.count
+    
+    def feed(self, chunk: str) -> None:
+        """Add the next chunk of text."""
+        for start in range(0, len(chunk), PIECE_CHARS):
+            self._feed_piece(chunk[start:start + PIECE_CHARS])
+    
+    def _feed_piece(self, text: str) -> None:
+        """Add up to PIECE_CHARS characters of text."""
+        self.characters += len(text)
+        self.characters_no_spaces += len(text) - text.count(" ") - text.count("\n")
+        # Cut before the last whitespace run; the run and the (possibly
+        # unfinished) word after it wait for the next piece
+        parts = text.rsplit(None, 1)
+        if parts == [text]:
+            # No whitespace at all (a long word, minified JSON, base64): count
+            # it right away, cut in the middle of its word, instead of holding
+            # it back. Sentence ends and paragraph breaks still count the same.
+            self._carry.append(text)
+            self._count("".join(self._carry))
+            self._carry = []
+            self._mid_word = True
+            return
+        if len(parts) < 2:
+            self._carry.append(text)
+            return
+        head = parts[0]
+        self._carry.append(head)
+        piece = "".join(self._carry)
+        self._carry = [text[len(head):]]
+        self._count(piece)
+    
+    def _count(self, piece: str) -> None:
+        """Count a piece that ends at a word boundary."""
+        words = piece.split()
+        self.words += len(words)
+        if self._mid_word and words and not piece[0].isspace():
+            # The first word continues the last one counted
+            self.words -= 1
+        self._mid_word = False
+        self.word_characters += sum(map(len, words))
+        self._sentences.add(_SENTENCE_END_RE.split(piece))
+        self._paragraphs.add(piece.split("\n\n"))
+    
+    def finish(self) -> "TextStats":
+        """Count the text held back from the last chunk."""
+        if self._carry:
+            self._count("".join(self._carry))
+            self._carry = []
+        return self
+    
+    def result(self) -> Dict[str, Any]:
+        """word_count's result."""
+        return {
+            "characters": self.characters,
+            "characters_no_spaces": self.characters_no_spaces,
+            "words": self.words,
+            "sentences": self.sentences,
+            "paragraphs": self.paragraphs,
+            "average_word_length": round(self.word_characters / max(self.words, 1), 2),
+            "reading_time_minutes": round(self.words / 200, 1),  # Average reading speed
+            "speaking_time_minutes": round(self.words / 130, 1)  # Average speaking speed
+        }
@@ -0,0 +1 @@
+"""Benchmarks for GENIE Server (run from genie_server/ with ``python -m benchmarks.<name>``)."""
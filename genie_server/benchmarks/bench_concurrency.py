@@ -0,0 +1,86 @@
+"""
+Concurrency benchmark for the data tools.
+
+Measures the latency of an unrelated tool (convert_length) while a slow
+get_userData query is in flight: once with the query running on the blocking
+pymongo client inside the event loop (the old path), and once through the
+async tool. The probe latency is measured from the moment the probe was due
+to run, so event-loop stalls show up directly in p99.
+
+Requires a reachable MongoDB with server-side JavaScript enabled, since the
+slow query is simulated with ``$where: sleep(...)``. A scratch database
+(default ``genie_bench``) is seeded with one user document.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_concurrency --sleep-ms 500 --queries 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List
+
+from benchmarks.common import summarize
+
+
+async def _probe(mcp, stop: asyncio.Event, latencies: List[float], interval: float) -> None:
+    """Call a cheap tool on a fixed schedule and record how late it completes."""
+    while not stop.is_set():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        await mcp.call_tool("convert_length", {"value": 1, "from_unit": "km", "to_unit": "mile"})
+        latencies.append((time.perf_counter() - due) * 1000)
+
+
+async def _run_mode(mode: str, query: dict, queries: int, interval: float) -> dict:
+    from app import mcp
+    from app.database import get_collection
+    
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(mcp, stop, latencies, interval))
+    await asyncio.sleep(0.05)
+    
+    start = time.perf_counter()
+    for _ in range(queries):
+        if mode == "blocking":
+            # The pre-async behaviour: pymongo called directly on the event loop
+            list(get_collection("users").find(query).limit(1))
+        else:
+            await mcp.call_tool("get_userData", {"query": query, "limit": 1})
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    await probe
+    return {"mode": mode, "query_seconds": round(elapsed, 3), "probe_ms": summarize(latencies)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sleep-ms", type=int, default=500, help="Server-side delay per slow query")
+    parser.add_argument("--queries", type=int, default=3, help="Slow queries per mode")
+    parser.add_argument("--interval-ms", type=float, default=5, help="Probe call interval")
+    parser.add_argument("--db", default="genie_bench", help="Scratch database name")
+    args = parser.parse_args()
+    
+    # Settings read the environment at import time
+    os.environ["MONGO_DEFAULT_DB"] = args.db
+    import server  # noqa: F401  (registers all tools)
+    from app.database import get_collection
+    
+    users = get_collection("users")
+    if users.count_documents({}) == 0:
+        users.insert_one({"name": "bench", "steps": 1000})
+    
+    query = {"$where": f"sleep({args.sleep_ms}) || true"}
+    interval = args.interval_ms / 1000
+    results = [
+        await _run_mode("blocking", query, args.queries, interval),
+        await _run_mode("async", query, args.queries, interval),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Benchmark for single-pass entity extraction.
+
+Compares calling extract_urls, extract_emails, extract_hashtags and
+extract_mentions one after another (four scans of the text) with one
+extract_entities call (one scan), on log-like inputs of several megabytes.
+Tool functions are called directly, without MCP or the process pool.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_extract --sizes-mb 1 4 16 --repeats 3
+"""
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+_WORDS = "request served user login failed retry cache miss steps sleep heart rate".split()
+
+
+def make_text(size_bytes: int, seed: int = 0) -> str:
+    """Log-like text with a mix of plain words, URLs, emails, hashtags and mentions."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size_bytes:
+        roll = rng.random()
+        if roll < 0.03:
+            part = f"https://{rng.choice(_WORDS)}.example.com/{rng.randint(1, 5000)}?ref=feed#top"
+        elif roll < 0.05:
+            part = f"{rng.choice(_WORDS)}{rng.randint(1, 2000)}@mail{rng.randint(1, 50)}.example.org"
+        elif roll < 0.07:
+            part = f"#{rng.choice(_WORDS)}{rng.randint(1, 300)}"
+        elif roll < 0.09:
+            part = f"@{rng.choice(_WORDS)}_{rng.randint(1, 300)}"
+        else:
+            part = rng.choice(_WORDS)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:size_bytes]
+
+
+def best_of(fn: Callable[[], Any], repeats: int) -> float:
+    """Fastest of several runs, in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16], help="Input sizes in MB")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the fastest counts")
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    from app.tools.web import extract_emails, extract_entities, extract_hashtags, extract_mentions, extract_urls
+    
+    def separate(text: str) -> None:
+        for tool in (extract_urls, extract_emails, extract_hashtags, extract_mentions):
+            tool(text)
+    
+    results: List[Dict[str, Any]] = []
+    for size_mb in args.sizes_mb:
+        text = make_text(int(size_mb * 1024 * 1024))
+        separate_ms = best_of(lambda: separate(text), args.repeats)
+        combined_ms = best_of(lambda: extract_entities(text), args.repeats)
+        results.append({
+            "size_mb": size_mb,
+            "entities": extract_entities(text)["counts"],
+            "separate_ms": round(separate_ms, 1),
+            "combined_ms": round(combined_ms, 1),
+            "speedup": round(separate_ms / combined_ms, 2) if combined_ms else None,
+            "combined_mb_per_s": round(size_mb / (combined_ms / 1000), 1) if combined_ms else None,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+BSON-to-JSON conversion benchmark.
+
+Compares the old json.loads(json_util.dumps(doc)) round trip against the
+single-pass bson_to_json() on realistic user documents (ObjectIds, dates,
+Decimal128, Binary and nested arrays of activity records), both for decoded
+dicts and for RawBSONDocument input. Outputs are checked for equality first.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_serialization --docs 10000 --repeat 5
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import bson
+from bson import Binary, Decimal128, ObjectId, json_util
+from bson.raw_bson import RawBSONDocument
+
+from app.utils.serialization import bson_to_json
+
+
+def make_user(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Build a user document shaped like the fitbit dataset."""
+    start = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 500000))
+    return {
+        "_id": ObjectId(),
+        "user_id": index,
+        "name": f"User {index}",
+        "email": f"user{index}@example.com",
+        "age": rng.randint(18, 80),
+        "active": rng.random() > 0.2,
+        "created_at": start,
+        "weight_kg": Decimal128(f"{rng.uniform(45, 120):.2f}"),
+        "avatar": Binary(rng.randbytes(32)),
+        "tags": rng.sample(["runner", "cyclist", "swimmer", "hiker", "yoga"], 2),
+        "activity": [
+            {
+                "date": start + timedelta(days=day, milliseconds=rng.randint(0, 999)),
+                "steps": rng.randint(1000, 20000),
+                "calories": round(rng.uniform(1500, 3500), 1),
+                "heart_rate": {"resting": rng.randint(50, 80), "max": rng.randint(120, 190)},
+            }
+            for day in range(14)
+        ],
+    }
+
+
+def roundtrip(doc: Any) -> Any:
+    """The previous conversion: serialize to a string and parse it back."""
+    return json.loads(json_util.dumps(doc))
+
+
+def best_of(fn: Callable[[Any], Any], docs: List[Any], repeat: int) -> float:
+    """Best wall time in seconds of converting every document."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000, help="Number of documents")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported)")
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    docs = [make_user(rng, i) for i in range(args.docs)]
+    raw_docs = [RawBSONDocument(bson.encode(doc)) for doc in docs]
+    
+    for doc, raw in zip(docs, raw_docs):
+        assert bson_to_json(doc) == roundtrip(doc), "dict output differs from json_util"
+        assert bson_to_json(raw) == roundtrip(raw), "raw output differs from json_util"
+    
+    results = {}
+    for label, fn, data in [
+        ("dumps_loads_dict", roundtrip, docs),
+        ("bson_to_json_dict", bson_to_json, docs),
+        ("dumps_loads_raw", roundtrip, raw_docs),
+        ("bson_to_json_raw", bson_to_json, raw_docs),
+    ]:
+        seconds = best_of(fn, data, args.repeat)
+        results[label] = {"seconds": round(seconds, 4), "docs_per_second": round(len(data) / seconds)}
+    
+    results["speedup_dict"] = round(results["dumps_loads_dict"]["seconds"] / results["bson_to_json_dict"]["seconds"], 2)
+    results["speedup_raw"] = round(results["dumps_loads_raw"]["seconds"] / results["bson_to_json_raw"]["seconds"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
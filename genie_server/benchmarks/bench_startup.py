@@ -0,0 +1,118 @@
+"""
+Cold-start gate for the MCP server.
+
+Imports ``server`` in fresh interpreters with ``-X importtime`` and checks:
+
+- the cumulative import time of ``server`` stays within a budget (best of
+  several runs, to filter out scheduler noise);
+- heavy dependencies that are only needed on first use (pymongo, bson) are
+  not imported at startup;
+- all tools are still registered, i.e. tool metadata is available
+  immediately.
+
+Exits with status 1 if any check fails, so it can run as a CI step.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_startup --budget-ms 1500 --runs 3
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# "import time:  self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+_PROBE = """
+import json, sys
+import server
+from app import mcp
+print(json.dumps({
+    "modules": sorted(sys.modules),
+    "tools": len(mcp._tool_manager.list_tools()),
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse -X importtime output into (module, self_us, cumulative_us) rows.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def measure_once() -> Tuple[float, Dict[str, float]]:
+    """
+    Import server once in a fresh interpreter.
+    
+    Returns:
+        Cumulative import time of server in ms, and self time per top-level package in ms.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = parse_importtime(result.stderr)
+    total = next(cumulative for module, _, cumulative in rows if module == "server")
+    by_package: Dict[str, float] = defaultdict(float)
+    for module, self_us, _ in rows:
+        by_package[module.split(".")[0]] += self_us / 1000
+    return total / 1000, by_package
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Max cumulative import time of server")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start; the fastest counts")
+    parser.add_argument("--forbid", nargs="*", default=["pymongo", "bson"],
+                        help="Top-level packages that must not be imported at startup")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to report")
+    args = parser.parse_args()
+    
+    samples = [measure_once() for _ in range(max(1, args.runs))]
+    best_ms, by_package = min(samples, key=lambda sample: sample[0])
+    
+    probe = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True)
+    state = json.loads(probe.stdout.strip().splitlines()[-1])
+    loaded = {module.split(".")[0] for module in state["modules"]}
+    forbidden = sorted(set(args.forbid) & loaded)
+    
+    failures = []
+    if best_ms > args.budget_ms:
+        failures.append(f"import time {best_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if forbidden:
+        failures.append(f"imported at startup: {', '.join(forbidden)}")
+    if state["tools"] == 0:
+        failures.append("no tools registered at startup")
+    
+    report = {
+        "import_ms": round(best_ms, 1),
+        "runs_ms": [round(sample[0], 1) for sample in samples],
+        "budget_ms": args.budget_ms,
+        "tools_registered": state["tools"],
+        "forbidden_loaded": forbidden,
+        "slowest_packages_ms": {
+            package: round(ms, 1)
+            for package, ms in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        },
+        "passed": not failures,
+    }
+    print(json.dumps(report, indent=2))
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
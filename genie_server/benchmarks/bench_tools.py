@@ -0,0 +1,290 @@
+"""
+Micro-benchmarks with regression gates for the pure tools.
+
+Calls every tool function in utilities.py, web.py, code.py and
+visualization.py directly (no MCP, no executor) with small, medium and
+pathological inputs, and reports the best per-call time of several repeats.
+
+A baseline is committed as benchmarks/bench_tools_baseline.json, which
+--check uses by default. Timings are machine-specific: when checking on
+other hardware (e.g. the CI runner), record a baseline there first, and
+refresh the committed one with --save-baseline when a change is meant to
+move the numbers.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_tools --check
+    python -m benchmarks.bench_tools --save-baseline
+    python -m benchmarks.bench_tools --check my_baseline.json --tolerance 0.25
+    python -m benchmarks.bench_tools --tools word_count diff_text extract_urls
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_tools_baseline.json")
+
+# (size, arguments) per tool; inputs are built once, before timing
+Cases = Dict[str, List[Tuple[str, Dict[str, Any]]]]
+
+
+def _lines(count: int, prefix: str) -> str:
+    return "\n".join(f"{prefix} line {i} with some text" for i in range(count))
+
+
+def _prose(words: int) -> str:
+    sentence = "The quick brown fox jumps over the lazy dog. "
+    return (sentence * (words // 9 + 1))[: words * 5]
+
+
+def _json_doc(items: int, depth: int = 1) -> str:
+    doc: Any = [{"id": i, "name": f"item {i}", "tags": ["a", "b"], "score": i * 1.5} for i in range(items)]
+    for _ in range(depth - 1):
+        doc = {"nested": doc}
+    return json.dumps(doc)
+
+
+def _mixed_text(units: int) -> str:
+    unit = "Contact jane.doe@example.com or visit https://example.com/page?x=1 #launch @team. "
+    return unit * units
+
+
+def _urls(count: int) -> List[str]:
+    hosts = ["example.com", "api.example.co.uk", "user.github.io", "10.0.0.1:8080", "www.bbc.co.uk"]
+    return [f"https://{hosts[i % len(hosts)]}/path/{i}?page={i % 7}&q=x#top" for i in range(count)]
+
+
+def _domains(count: int) -> List[str]:
+    hosts = ["example.com", "a.b.example.co.uk", "user.github.io", "192.168.1.1", "www.city.kawasaki.jp", "localhost"]
+    return [f"host{i}.{hosts[i % len(hosts)]}" if i % 3 else hosts[i % len(hosts)] for i in range(count)]
+
+
+def _url_items(count: int) -> List[Dict[str, Any]]:
+    return [{"path": f"/users/{i}", "query_params": {"page": str(i % 9), "q": "a b"}} for i in range(count)]
+
+
+def build_cases() -> Cases:
+    """Build the benchmark inputs for every pure tool."""
+    labels = lambda n: [f"L{i}" for i in range(n)]  # noqa: E731
+    values = lambda n: [float(i % 97) for i in range(n)]  # noqa: E731
+    return {
+        # utilities.py
+        "generate_password": [("small", {"length": 16}), ("medium", {"length": 128}), ("pathological", {"length": 4096})],
+        "generate_uuid": [("small", {}), ("medium", {"count": 10}), ("pathological", {"count": 100})],
+        "hash_text": [("small", {"text": "hello"}), ("medium", {"text": _prose(2000)}),
+                      ("pathological", {"text": _prose(200000), "algorithm": "sha512"})],
+        "encode_base64": [("small", {"text": "hello"}), ("medium", {"text": _prose(2000)}),
+                          ("pathological", {"text": _prose(200000)})],
+        "word_count": [("small", {"text": "Hello world. Bye."}), ("medium", {"text": _prose(2000)}),
+                       ("pathological", {"text": _prose(200000)})],
+        "calculate_percentage": [("small", {"value": 25, "total": 200})],
+        "calculate_discount": [("small", {"original_price": 100, "discount_percent": 15})],
+        "calculate_tip": [("small", {"bill_amount": 84.5, "split_ways": 3})],
+        "calculate_bmi": [("small", {"weight_kg": 70, "height_cm": 175})],
+        "calculate_loan": [("small", {"principal": 250000, "annual_rate": 5.5, "months": 360}),
+                           ("pathological", {"principal": 1e9, "annual_rate": 0.01, "months": 12000})],
+        "convert_temperature": [("small", {"value": 21.5, "from_unit": "celsius", "to_unit": "fahrenheit"})],
+        "convert_length": [("small", {"value": 5, "from_unit": "km", "to_unit": "mile"})],
+        "convert_weight": [("small", {"value": 5, "from_unit": "kg", "to_unit": "lb"})],
+        "convert_data_size": [("small", {"value": 5, "from_unit": "GB", "to_unit": "MB"})],
+        "get_current_datetime": [("small", {"timezone_offset_hours": 2, "format": "iso"})],
+        "calculate_date_difference": [("small", {"date1": "2024-01-01", "date2": "2025-06-15"})],
+        "add_days_to_date": [("small", {"date": "2024-01-01", "days": 45})],
+        "format_json": [("small", {"json_string": '{"a": 1}'}), ("medium", {"json_string": _json_doc(200)}),
+                        ("pathological", {"json_string": _json_doc(5000, depth=50)})],
+        "generate_lorem_ipsum": [("small", {}), ("medium", {"paragraphs": 5, "words_per_paragraph": 200}),
+                                 ("pathological", {"paragraphs": 50, "words_per_paragraph": 2000})],
+        # web.py
+        "parse_url": [("small", {"url": "https://example.com/a?b=1"}),
+                      ("medium", {"url": "https://user@sub.example.co.uk:8443/a/b/c?" + "&".join(f"k{i}=v{i}" for i in range(50)) + "#frag"}),
+                      ("pathological", {"url": "https://example.com/?" + "&".join(f"k{i}=v{i}" for i in range(5000))})],
+        "build_url": [("small", {"base_url": "https://example.com", "path": "api", "query_params": {"q": "x"}}),
+                      ("medium", {"base_url": "https://example.com", "path": "api/v1",
+                                  "query_params": {f"k{i}": f"v {i}" for i in range(100)}})],
+        "encode_url": [("small", {"text": "hello world & more"}), ("medium", {"text": _mixed_text(50)}),
+                       ("pathological", {"text": _mixed_text(5000)})],
+        "extract_emails": [("small", {"text": _mixed_text(1)}), ("medium", {"text": _mixed_text(200)}),
+                           ("pathological", {"text": _mixed_text(20000)})],
+        "extract_urls": [("small", {"text": _mixed_text(1)}), ("medium", {"text": _mixed_text(200)}),
+                         ("pathological", {"text": _mixed_text(20000)})],
+        "validate_email": [("small", {"email": "jane.doe@example.com"}),
+                           ("pathological", {"email": "a" * 5000 + "@" + "b" * 5000 + ".com"})],
+        "generate_qr_data": [("small", {"content": "https://example.com"}),
+                             ("medium", {"content": _prose(300), "qr_type": "text"})],
+        "extract_hashtags": [("small", {"text": _mixed_text(1)}), ("medium", {"text": _mixed_text(200)}),
+                             ("pathological", {"text": _mixed_text(20000)})],
+        "extract_mentions": [("small", {"text": _mixed_text(1)}), ("medium", {"text": _mixed_text(200)}),
+                             ("pathological", {"text": _mixed_text(20000)})],
+        "extract_entities": [("small", {"text": _mixed_text(1)}), ("medium", {"text": _mixed_text(200)}),
+                             ("pathological", {"text": _mixed_text(20000)})],
+        "parse_urls": [("small", {"urls": _urls(10)}), ("medium", {"urls": _urls(1000), "group_by_domain": True}),
+                       ("pathological", {"urls": _urls(50000)})],
+        "build_urls": [("small", {"items": _url_items(10), "base_url": "https://api.example.com"}),
+                       ("medium", {"items": _url_items(1000), "base_url": "https://api.example.com"}),
+                       ("pathological", {"items": _url_items(50000), "base_url": "https://api.example.com"})],
+        "analyze_domain": [("small", {"domain": "example.com"}), ("medium", {"domain": "a.b.c.d.example.co.uk"})],
+        "analyze_domains": [("small", {"domains": _domains(10)}), ("medium", {"domains": _domains(1000)}),
+                            ("pathological", {"domains": _domains(50000), "include_columns": False})],
+        "slugify": [("small", {"text": "Hello World!"}), ("medium", {"text": _prose(500)}),
+                    ("pathological", {"text": "Crème brûlée — ünïcödé! " * 2000})],
+        # code.py
+        "test_regex": [("small", {"pattern": r"\d+", "test_string": "a1b22c333"}),
+                       ("medium", {"pattern": r"(\w+)@(\w+)\.com", "test_string": _mixed_text(200)}),
+                       # Nested quantifier backtracking, kept short enough to finish
+                       ("pathological", {"pattern": r"(a+)+b", "test_string": "a" * 18})],
+        "convert_color": [("small", {"color": "#36A2EB", "to_format": "hsl"})],
+        "generate_color_palette": [("small", {"base_color": "#36A2EB", "palette_type": "triadic"})],
+        "escape_string": [("small", {"text": "<a href='x'>&</a>"}), ("medium", {"text": _mixed_text(200)}),
+                          ("pathological", {"text": "<>&'\"" * 20000})],
+        "diff_text": [("small", {"text1": "a\nb\nc", "text2": "a\nx\nc"}),
+                      ("medium", {"text1": _lines(200, "old"), "text2": _lines(200, "new")}),
+                      ("pathological", {"text1": _lines(3000, "old"), "text2": _lines(3000, "new")})],
+        "minify_json": [("small", {"json_string": '{ "a": 1 }'}), ("medium", {"json_string": _json_doc(200)}),
+                        ("pathological", {"json_string": _json_doc(5000, depth=50)})],
+        "count_code_lines": [("small", {"code": "x = 1\n# c\n\ny = 2", "language": "python"}),
+                             ("medium", {"code": _lines(1000, "# code"), "language": "python"}),
+                             ("pathological", {"code": _lines(100000, "x = 1"), "language": "python"})],
+        "generate_color_from_text": [("small", {"text": "genie"}), ("medium", {"text": _prose(2000)})],
+        # visualization.py
+        "generate_pie_chart": [("small", {"labels": labels(5), "values": values(5)}),
+                               ("pathological", {"labels": labels(10000), "values": values(10000)})],
+        "generate_bar_chart": [("small", {"labels": labels(7), "values": values(7)}),
+                               ("pathological", {"labels": labels(10000), "values": values(10000)})],
+        "generate_line_chart": [("small", {"labels": labels(12), "datasets": [{"label": "a", "data": values(12)}]}),
+                                ("pathological", {"labels": labels(5000),
+                                                  "datasets": [{"label": f"s{i}", "data": values(5000)} for i in range(10)]})],
+        "generate_doughnut_chart": [("small", {"labels": labels(5), "values": values(5)}),
+                                    ("pathological", {"labels": labels(10000), "values": values(10000)})],
+        "generate_comparison_chart": [("small", {"categories": labels(4), "group_a_values": values(4),
+                                                 "group_b_values": values(4)}),
+                                      ("pathological", {"categories": labels(10000), "group_a_values": values(10000),
+                                                        "group_b_values": values(10000)})],
+        "generate_mermaid_diagram": [("small", {"content": "graph TD; A-->B"}),
+                                     ("medium", {"content": "graph TD;\n" + "\n".join(f"N{i}-->N{i + 1}" for i in range(500))})],
+        "generate_stats_dashboard": [("small", {"items": [{"label": "Steps", "value": "10k", "trend": "up"}]})],
+    }
+
+
+def load_tools() -> Dict[str, Callable[..., Any]]:
+    """Import the tool modules and return the plain tool functions by name."""
+    logging.disable(logging.CRITICAL)
+    from app.tools import code, utilities, visualization, web
+    
+    tools = {}
+    for module in (utilities, web, code, visualization):
+        for name, value in vars(module).items():
+            if callable(value) and getattr(value, "__module__", None) == module.__name__ and not name.startswith("_"):
+                # Memoized tools (app.utils.memoize) expose the uncached
+                # function as __wrapped__, so repeats measure the real work
+                tools[name] = getattr(value, "__wrapped__", value)
+    return tools
+
+
+def time_call(fn: Callable[..., Any], kwargs: Dict[str, Any], repeats: int, min_time: float) -> float:
+    """
+    Best per-call time in microseconds over several repeats.
+    
+    Each repeat runs enough calls to last at least min_time seconds.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn(**kwargs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn(**kwargs)
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best * 1e6
+
+
+def run_suite(selected: List[str], repeats: int, min_time: float) -> Dict[str, float]:
+    """Time every (tool, size) case; keys are "tool/size"."""
+    tools = load_tools()
+    cases = build_cases()
+    # Every pure tool must be covered, so new tools cannot slip past the gate
+    missing = sorted(set(tools) - set(cases))
+    if missing:
+        sys.exit(f"error: no benchmark cases for {', '.join(missing)}; add them to build_cases()")
+    unknown = sorted(set(cases) - set(tools))
+    if unknown:
+        sys.exit(f"error: benchmark cases for unknown tools {', '.join(unknown)}")
+    results = {}
+    for name in sorted(cases):
+        if selected and name not in selected:
+            continue
+        for size, kwargs in cases[name]:
+            results[f"{name}/{size}"] = round(time_call(tools[name], kwargs, repeats, min_time), 3)
+            print(f"{name + '/' + size:40} {results[f'{name}/{size}']:14.3f} us", file=sys.stderr)
+    return results
+
+
+def check(results: Dict[str, float], baseline: Dict[str, float], tolerance: float, floor_us: float) -> List[str]:
+    """
+    Compare results with a baseline.
+    
+    A case regresses when it is slower than the baseline by more than the
+    relative tolerance and by more than floor_us, so sub-microsecond jitter
+    on trivial tools does not fail the gate. A case missing from the
+    baseline fails it too, since it would otherwise never be checked.
+    """
+    regressions = []
+    for case, current in sorted(results.items()):
+        before = baseline.get(case)
+        if before is None:
+            regressions.append(f"{case}: not in the baseline; record it with --save-baseline")
+            continue
+        if current > before * (1 + tolerance) and current - before > floor_us:
+            regressions.append(f"{case}: {before:.3f} -> {current:.3f} us ({(current / before - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", nargs="*", default=[], help="Only benchmark these tools")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats per case; the fastest counts")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per repeat")
+    parser.add_argument("--save-baseline", metavar="PATH", nargs="?", const=BASELINE_PATH,
+                        help="Write results as the new baseline (default: the committed one)")
+    parser.add_argument("--check", metavar="PATH", nargs="?", const=BASELINE_PATH,
+                        help="Fail if any case regressed against this baseline (default: the committed one)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown for --check")
+    parser.add_argument("--floor-us", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    
+    results = run_suite(args.tools, max(1, args.repeats), args.min_time)
+    print(json.dumps(results, indent=2))
+    
+    if args.save_baseline:
+        saved = results
+        if args.tools and os.path.exists(args.save_baseline):
+            # Only the selected tools were run; keep the other cases
+            with open(args.save_baseline) as f:
+                saved = {**json.load(f), **results}
+        with open(args.save_baseline, "w") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.save_baseline}", file=sys.stderr)
+    
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        regressions = check(results, baseline, args.tolerance, args.floor_us)
+        if regressions:
+            for regression in regressions:
+                print(f"REGRESSION: {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.check}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark for the streaming word_count.
+
+Compares the previous word_count implementation (whole-text split() and
+re.split() calls, kept here as the reference) with the TextStats scanner
+behind word_count now, on inputs of several megabytes: prose, and a
+base64-like blob without whitespace (one long word, as in minified JSON or
+encoded data). Both must return the same statistics. Peak memory is measured with tracemalloc, on top
+of the input text itself. Tool functions are called directly, without MCP
+or the process pool.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_word_count --sizes-mb 1 4 16 --repeats 3
+"""
+import argparse
+import base64
+import json
+import logging
+import random
+import re
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_extract import best_of
+
+_WORDS = "the request was served to a user who had failed to login after many retries and cache misses".split()
+
+
+def make_text(size_bytes: int, seed: int = 0) -> str:
+    """Prose-like text with sentences of varying length and blank-line paragraph breaks."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size_bytes:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 25)))
+        part = sentence.capitalize() + rng.choice(".....!?") + rng.choice("  \n") * (1 + (rng.random() < 0.15))
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size_bytes]
+
+
+def make_blob(size_bytes: int, seed: int = 0) -> str:
+    """Base64 text without any whitespace."""
+    rng = random.Random(seed)
+    return base64.b64encode(rng.randbytes(size_bytes * 3 // 4 + 3)).decode("ascii")[:size_bytes]
+
+
+INPUTS: Dict[str, Callable[[int], str]] = {"prose": make_text, "no_whitespace": make_blob}
+
+
+def legacy_word_count(text: str) -> Dict[str, Any]:
+    """word_count before the streaming scanner."""
+    words = text.split()
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+    paragraphs = text.split('\n\n')
+    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    
+    return {
+        "characters": len(text),
+        "characters_no_spaces": len(text.replace(" ", "").replace("\n", "")),
+        "words": len(words),
+        "sentences": len(sentences),
+        "paragraphs": len(paragraphs),
+        "average_word_length": round(sum(len(w) for w in words) / max(len(words), 1), 2),
+        "reading_time_minutes": round(len(words) / 200, 1),
+        "speaking_time_minutes": round(len(words) / 130, 1)
+    }
+
+
+def peak_mb(fn: Callable[[], Any]) -> float:
+    """Peak memory allocated during one run, in megabytes."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def measure(word_count: Callable[[str], Dict[str, Any]], kind: str, size_mb: float, text: str,
+            repeats: int) -> Dict[str, Any]:
+    """Compare both implementations on one input."""
+    expected = legacy_word_count(text)
+    actual = word_count(text)
+    if actual != expected:
+        raise SystemExit(f"word_count differs from the previous implementation on {size_mb} MB of {kind}: "
+                         f"{actual} != {expected}")
+    legacy_ms = best_of(lambda: legacy_word_count(text), repeats)
+    streaming_ms = best_of(lambda: word_count(text), repeats)
+    return {
+        "input": kind,
+        "size_mb": size_mb,
+        "words": actual["words"],
+        "legacy_ms": round(legacy_ms, 1),
+        "streaming_ms": round(streaming_ms, 1),
+        "speedup": round(legacy_ms / streaming_ms, 2) if streaming_ms else None,
+        "legacy_peak_mb": round(peak_mb(lambda: legacy_word_count(text)), 1),
+        "streaming_peak_mb": round(peak_mb(lambda: word_count(text)), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16], help="Input sizes in MB")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the fastest counts")
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    from app.tools.utilities import word_count
+    
+    results: List[Dict[str, Any]] = []
+    for size_mb in args.sizes_mb:
+        for kind, make in INPUTS.items():
+            results.append(measure(word_count, kind, size_mb, make(int(size_mb * 1024 * 1024)), args.repeats))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
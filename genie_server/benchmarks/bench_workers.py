@@ -0,0 +1,107 @@
+"""
+Throughput benchmark for the multi-process serving mode.
+
+Starts ``python server.py`` once per worker count (SERVER_WORKERS=N, which
+also switches the server to stateless sessions), drives it with concurrent
+JSON-RPC ``tools/call`` requests over streamable HTTP for a fixed duration,
+and reports requests per second and latency percentiles for each count.
+
+The default load is word_count on a text below TOOL_OFFLOAD_MIN_BYTES, so
+the tool runs inline on each worker's event loop and throughput is bound
+by the number of worker processes.
+
+Usage (from genie_server/):
+    python -m benchmarks.bench_workers --workers 1 2 4 --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import MCP_HEADERS, start_server, summarize, wait_ready
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    payload: Dict[str, Any],
+    deadline: float,
+    latencies: List[float],
+    errors: List[int]
+) -> None:
+    """Send requests back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/mcp", headers=MCP_HEADERS, json=payload)
+            ok = response.status_code == 200 and '"isError":true' not in response.text.replace(" ", "")
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(1)
+
+
+async def _run(workers: int, args: argparse.Namespace, payload: Dict[str, Any]) -> Dict[str, Any]:
+    server = start_server(args.port, SERVER_WORKERS=str(workers), HTTP_STATELESS="true")
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            # Warm-up: let every worker accept connections and import lazily loaded code
+            await asyncio.sleep(1.0)
+            warm_deadline = time.perf_counter() + 1.0
+            await asyncio.gather(*(_client_loop(client, payload, warm_deadline, [], []) for _ in range(args.concurrency)))
+            
+            latencies: List[float] = []
+            errors: List[int] = []
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(
+                *(_client_loop(client, payload, deadline, latencies, errors) for _ in range(args.concurrency))
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds per worker count")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the benchmark server")
+    parser.add_argument("--text-bytes", type=int, default=8000, help="Size of the word_count input")
+    args = parser.parse_args()
+    
+    text = ("The quick brown fox jumps over the lazy dog. " * (args.text_bytes // 45 + 1))[:args.text_bytes]
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": "word_count", "arguments": {"text": text}},
+    }
+    
+    results = []
+    for workers in args.workers:
+        results.append(await _run(workers, args, payload))
+    baseline = results[0]["rps"] or 1
+    for result in results:
+        result["speedup"] = round(result["rps"] / baseline, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+MCP_HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of a list of samples.
+    
+    Args:
+        samples: Sample values (need not be sorted).
+        pct: Percentile between 0 and 100.
+        
+    Returns:
+        The percentile value, or 0.0 for an empty sample list.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples (milliseconds) as count, p50, p95, p99 and max.
+    """
+    return {
+        "count": len(samples),
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "max": round(max(samples), 3) if samples else 0.0,
+    }
+
+
+def start_server(port: int, **env: str) -> subprocess.Popen:
+    """
+    Start ``python server.py`` on a port with extra environment variables.
+    
+    Must be called from genie_server/. Output is discarded.
+    """
+    return subprocess.Popen(
+        [sys.executable, "server.py"],
+        env=dict(os.environ, SERVER_PORT=str(port), LOG_LEVEL="WARNING", **env),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_ready(client: Any, timeout: float = 60) -> None:
+    """
+    Poll /metrics with an httpx.AsyncClient until the server answers.
+    """
+    import httpx
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/metrics")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not start in time")
+        await asyncio.sleep(0.2)
+
+
+def parse_mcp_response(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the JSON-RPC message from a streamable-http response body (SSE or JSON).
+    """
+    for line in text.splitlines():
+        if line.startswith("data:"):
+            return json.loads(line[5:])
+    return json.loads(text) if text.strip() else None
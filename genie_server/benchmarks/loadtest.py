@@ -0,0 +1,277 @@
+"""
+End-to-end load test for the MCP server over streamable HTTP.
+
+Opens concurrent MCP sessions (initialize + notifications/initialized), then
+each session issues tools/call requests back to back, picking tools from a
+weighted mix with randomized arguments. Reports overall throughput and per-tool
+p50/p95/p99 latency, and saves the results as JSON so runs can be compared
+across commits (--compare prints the p95 change against an earlier file).
+
+get_userData needs MongoDB: point the server at a local mongod (MONGO_URI) and
+use --seed-users to fill a scratch database with synthetic users first. There
+is no in-process stand-in for MongoDB; without one, leave get_userData out of
+the mix (it is not in the default mix).
+
+Usage (from genie_server/):
+    # Against a running server
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --sessions 20 --duration 30
+    # Start a server for the run, including data calls
+    python -m benchmarks.loadtest --spawn --seed-users 1000 \\
+        --mix generate_bar_chart=2,convert_length=4,test_regex=2,word_count=2,get_userData=2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import MCP_HEADERS, parse_mcp_response, start_server, summarize, wait_ready
+
+DEFAULT_MIX = "generate_bar_chart=2,convert_length=4,test_regex=2,word_count=2,extract_urls=1"
+
+_WORDS = "alpha beta gamma delta steps sleep heart rate walk run cycle swim".split()
+_UNITS = ["mm", "cm", "m", "km", "inch", "foot", "yard", "mile"]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    """Random sentences of filler words."""
+    out = []
+    for i in range(words):
+        out.append(rng.choice(_WORDS))
+        if i % 12 == 11:
+            out[-1] += "."
+    return " ".join(out)
+
+
+# Tool name -> argument generator
+SCENARIOS: Dict[str, Callable[[random.Random], Dict[str, Any]]] = {
+    "generate_bar_chart": lambda rng: {
+        "labels": [f"Day {i}" for i in range(1, 8)],
+        "values": [rng.randint(1000, 15000) for _ in range(7)],
+        "title": "Steps per day",
+    },
+    "generate_line_chart": lambda rng: {
+        "labels": [f"W{i}" for i in range(1, 13)],
+        "datasets": [{"label": "Resting HR", "data": [rng.randint(55, 75) for _ in range(12)]}],
+    },
+    "convert_length": lambda rng: {
+        "value": rng.uniform(0.1, 1000),
+        "from_unit": rng.choice(_UNITS),
+        "to_unit": rng.choice(_UNITS),
+    },
+    "test_regex": lambda rng: {
+        "pattern": r"(\w+)@(\w+)\.com",
+        "test_string": " ".join(f"{rng.choice(_WORDS)}@{rng.choice(_WORDS)}.com" for _ in range(20)),
+    },
+    "word_count": lambda rng: {"text": _text(rng, rng.randint(50, 2000))},
+    "extract_urls": lambda rng: {
+        "text": " ".join(f"see https://{rng.choice(_WORDS)}.example.com/{i}" for i in range(30)),
+    },
+    "get_userData": lambda rng: {
+        "query": {"user_id": rng.randint(1, 1000)},
+        "fields": ["user_id", "name", "steps"],
+        "limit": 5,
+    },
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "tool=weight,tool=weight" into a weight map."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown tool in mix: {name} (known: {', '.join(sorted(SCENARIOS))})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def seed_users(count: int) -> None:
+    """Insert synthetic users into the configured database, replacing earlier seed data."""
+    from app.database import get_collection
+    
+    users = get_collection("users")
+    rng = random.Random(0)
+    users.delete_many({"seeded": True})
+    users.insert_many([
+        {"user_id": i, "name": f"user{i}", "steps": rng.randint(0, 20000), "seeded": True}
+        for i in range(1, count + 1)
+    ])
+    users.create_index("user_id")
+
+
+class Session:
+    """One MCP client session over streamable HTTP."""
+    
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.headers = dict(MCP_HEADERS)
+        self._next_id = 0
+    
+    async def _post(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self.client.post("/mcp", headers=self.headers, json=payload)
+        response.raise_for_status()
+        return parse_mcp_response(response.text)
+    
+    async def initialize(self) -> None:
+        response = await self.client.post("/mcp", headers=self.headers, json={
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "genie-loadtest", "version": "1"},
+            },
+        })
+        response.raise_for_status()
+        # Stateless servers do not issue a session id
+        session_id = response.headers.get("mcp-session-id")
+        if session_id:
+            self.headers["mcp-session-id"] = session_id
+        await self.client.post("/mcp", headers=self.headers, json={
+            "jsonrpc": "2.0",
+            "method": "notifications/initialized",
+        })
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> bool:
+        """Call a tool; returns False on a protocol, tool or {"error": ...} failure."""
+        self._next_id += 1
+        message = await self._post({
+            "jsonrpc": "2.0",
+            "id": self._next_id,
+            "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+        })
+        result = (message or {}).get("result")
+        if not result or result.get("isError"):
+            return False
+        structured = (result.get("structuredContent") or {}).get("result", result.get("structuredContent"))
+        return not (isinstance(structured, dict) and "error" in structured)
+
+
+async def _session_loop(
+    client: httpx.AsyncClient,
+    weights: Dict[str, float],
+    seed: int,
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int]
+) -> None:
+    rng = random.Random(seed)
+    session = Session(client)
+    await session.initialize()
+    names, tool_weights = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, tool_weights)[0]
+        arguments = SCENARIOS[name](rng)
+        start = time.perf_counter()
+        try:
+            ok = await session.call_tool(name, arguments)
+        except httpx.HTTPError:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        if ok:
+            latencies[name].append(elapsed)
+        else:
+            errors[name] += 1
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(current: Dict[str, Any], path: str) -> None:
+    """Print the per-tool p95 change against an earlier results file."""
+    with open(path) as f:
+        previous = json.load(f)
+    print(f"p95 vs {path} ({previous.get('commit')}):")
+    for name, stats in sorted(current["tools"].items()):
+        before = previous.get("tools", {}).get(name, {}).get("latency_ms", {}).get("p95")
+        after = stats["latency_ms"]["p95"]
+        if before:
+            print(f"  {name:24} {before:9.2f} -> {after:9.2f} ms ({(after - before) / before * 100:+.1f}%)")
+        else:
+            print(f"  {name:24} {'-':>9} -> {after:9.2f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL (without /mcp)")
+    parser.add_argument("--spawn", action="store_true", help="Start python server.py for the run")
+    parser.add_argument("--port", type=int, default=8766, help="Port for --spawn")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent MCP sessions")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted tool mix, e.g. word_count=2,convert_length=4")
+    parser.add_argument("--seed-users", type=int, default=0, help="Seed this many users for get_userData first")
+    parser.add_argument("--db", default="genie_bench", help="Scratch database for --seed-users and --spawn")
+    parser.add_argument("--output", default="loadtest-results.json", help="Where to save the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare p95 latency against")
+    args = parser.parse_args()
+    
+    weights = parse_mix(args.mix)
+    if args.seed_users:
+        # Settings read the environment at import time
+        os.environ["MONGO_DEFAULT_DB"] = args.db
+        seed_users(args.seed_users)
+    
+    server = start_server(args.port, MONGO_DEFAULT_DB=args.db) if args.spawn else None
+    base_url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    try:
+        limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            await wait_ready(client)
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*(
+                _session_loop(client, weights, seed, deadline, latencies, errors)
+                for seed in range(args.sessions)
+            ))
+            elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    
+    total = sum(len(samples) for samples in latencies.values())
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "config": {"sessions": args.sessions, "duration": args.duration, "mix": weights, "url": base_url},
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": round(total / elapsed, 1),
+        "tools": {
+            name: {
+                "requests": len(latencies[name]),
+                "errors": errors[name],
+                "rps": round(len(latencies[name]) / elapsed, 1),
+                "latency_ms": summarize(latencies[name]),
+            }
+            for name in sorted(weights)
+        },
+    }
+    print(json.dumps(results, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {args.output}")
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,27 +4,99 @@ GENIE MCP Server - Entry Point
 A modular MCP server exposing tools for analytics, finance, and data access.
 """
 import logging
-import sys
+from contextlib import asynccontextmanager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=sys.stdout
-)
+from app.config import settings
+from app.logging_config import setup_logging
+
+# Configure logging (queued: log calls never wait for stdout)
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLE_RATES)
 
 logger = logging.getLogger(__name__)
 
+from starlette.applications import Starlette
+from starlette.middleware.gzip import GZipMiddleware
+
 # Import the MCP server instance
 from app import mcp
+from app.execution import shutdown_pools
 
 # Import all tool modules to register them with the server
-from app.tools import analytics, finance, data, visualization, utilities, web, code  # noqa: F401
+from app.tools import analytics, finance, data, visualization, utilities, web, code, batch  # noqa: F401
+
+# Import HTTP routes (/metrics) to register them with the server
+from app import routes  # noqa: F401
 
 logger.info("GENIE MCP Server initialized")
-logger.info("Registered tool modules: analytics, finance, data, visualization, utilities, web, code")
+logger.info("Registered tool modules: analytics, finance, data, visualization, utilities, web, code, batch")
+
+
+def _add_compression(app: Starlette) -> None:
+    """
+    Compress large HTTP responses for clients that accept it.
+    
+    Uses brotli (with gzip fallback) when the optional brotli-asgi package is
+    installed, gzip otherwise.
+    """
+    if not settings.HTTP_COMPRESSION_MIN_BYTES:
+        return
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        app.add_middleware(GZipMiddleware, minimum_size=settings.HTTP_COMPRESSION_MIN_BYTES, compresslevel=6)
+        return
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.HTTP_COMPRESSION_MIN_BYTES, gzip_fallback=True)
+
+
+def create_app() -> Starlette:
+    """
+    Build the streamable-http ASGI app with GENIE's startup hooks.
+    
+    The MCP session manager's lifespan is kept and wrapped, so startup work
+    (such as MongoDB pool warm-up) runs on the event loop that serves requests,
+    and the tool executor pools are shut down on exit. Large responses are
+    compressed.
+    
+    Returns:
+        Starlette: The ASGI application.
+    """
+    app = mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        if settings.MONGO_WARMUP:
+            # Imported here: the MongoDB driver is otherwise loaded on the first data call
+            from app.database import warm_up_async_mongo_pool
+            await warm_up_async_mongo_pool()
+        try:
+            async with session_lifespan(app):
+                yield
+        finally:
+            shutdown_pools()
+    
+    app.router.lifespan_context = lifespan
+    _add_compression(app)
+    return app
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     logger.info("Starting GENIE MCP Server...")
-    mcp.run(transport="streamable-http")
\ No newline at end of file
+    workers = settings.SERVER_WORKERS
+    if workers > 1:
+        if not mcp.settings.stateless_http:
+            raise SystemExit("SERVER_WORKERS > 1 requires stateless sessions (HTTP_STATELESS=true)")
+        logger.info(f"Serving with {workers} worker processes")
+    uvicorn.run(
+        # With several workers, each process imports this module and builds its own app
+        "server:create_app" if workers > 1 else create_app(),
+        factory=workers > 1,
+        workers=workers,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=settings.LOG_LEVEL.lower(),
+        # Leave uvicorn's loggers to propagate into the queued root handler
+        log_config=None
+    )
@@ -0,0 +1,7 @@
+"""
+Test setup: make the app package importable however pytest is started.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+"""
+Output budget of batch_call.
+"""
+import asyncio
+import logging
+
+from app.config import settings
+from app.tools import utilities  # noqa: F401
+from app.tools.batch import batch_call
+from app.utils.budget import json_size
+
+logging.disable(logging.CRITICAL)
+
+LOREM = {"tool": "generate_lorem_ipsum", "arguments": {"paragraphs": 10, "words_per_paragraph": 200}}
+UUID = {"tool": "generate_uuid", "arguments": {}}
+
+
+def test_largest_results_are_replaced_to_fit_the_budget(monkeypatch):
+    calls = [LOREM, UUID, LOREM, UUID, LOREM]
+    lorem_bytes = json_size(asyncio.run(batch_call([LOREM]))["results"][0])
+    monkeypatch.setattr(settings, "TOOL_BATCH_MAX_OUTPUT_BYTES", int(lorem_bytes * 1.5))
+    
+    batch = asyncio.run(batch_call(calls))
+    results = batch["results"]
+    assert [(r["index"], r["tool"]) for r in results] == [(i, call["tool"]) for i, call in enumerate(calls)]
+    assert json_size(results) <= settings.TOOL_BATCH_MAX_OUTPUT_BYTES
+    dropped = [r for r in results if "result" not in r]
+    assert len(dropped) == 2 and batch["errors"] == 2
+    assert all(r["tool"] == "generate_lorem_ipsum" and "over the batch output budget" in r["error"] for r in dropped)
+    assert all("result" in results[i] for i in (1, 3))
+
+
+def test_zero_budget_keeps_every_result(monkeypatch):
+    monkeypatch.setattr(settings, "TOOL_BATCH_MAX_OUTPUT_BYTES", 0)
+    batch = asyncio.run(batch_call([LOREM] * 3))
+    assert batch["errors"] == 0
+    assert all("result" in r for r in batch["results"])
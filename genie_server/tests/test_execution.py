@@ -0,0 +1,79 @@
+"""
+Timed process tools in app.execution, and which test_regex calls they run.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+
+import pytest
+
+from app.execution import OffloadedTool, _offloaded
+from app.tools.code import _may_backtrack
+
+logging.disable(logging.CRITICAL)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+b",
+    r"(a|aa)+",
+    r"(?:x|(a|b)c)*d",
+    r"(\w+)\s\1",
+    r"(?P<q>['\"]).*?(?P=q)",
+    r"(a)?(?(1)b|c)",
+    r"\d+-\d+",
+    r"(x+x+)+y",
+])
+def test_patterns_that_may_backtrack_are_offloaded(pattern):
+    assert _may_backtrack({"pattern": pattern})
+    assert not _offloaded["test_regex"]._runs_inline((), {"pattern": pattern, "test_string": "aaaa"})
+
+
+@pytest.mark.parametrize("pattern", [
+    r"\d+",
+    r"[\w.]+@example\.com",
+    r"^abc$",
+    r"cat|dog",
+    r"a{2}",
+    r"(?i)hello\s*world",
+    "(",
+])
+def test_simple_patterns_stay_inline(pattern):
+    assert not _may_backtrack({"pattern": pattern})
+    assert _offloaded["test_regex"]._runs_inline((), {"pattern": pattern, "test_string": "aaaa"})
+
+
+def test_large_input_is_offloaded_even_with_a_simple_pattern():
+    arguments = {"pattern": r"\d+", "test_string": "1" * (1 << 20)}
+    assert not _offloaded["test_regex"]._runs_inline((), arguments)
+
+
+def live_children():
+    return {process for process in multiprocessing.active_children() if process.is_alive()}
+
+
+def test_call_over_timeout_kills_its_worker():
+    state = OffloadedTool("sleep", "process", 1, 0, timeout_ms=500)
+    before = live_children()
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="longer than 500 ms"):
+        asyncio.run(state.run(time.sleep, (30,), {}))
+    assert time.perf_counter() - started < 10
+    assert state.timeouts == 1
+    assert state.workers == [] and state.running == 0
+    deadline = time.monotonic() + 10
+    while live_children() - before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not live_children() - before
+
+
+def test_call_within_timeout_reuses_its_worker():
+    state = OffloadedTool("pow", "process", 1, 0, timeout_ms=60000)
+    try:
+        async def twice():
+            return [await state.run(pow, (2, 10), {}), await state.run(pow, (3, 2), {})]
+        assert asyncio.run(twice()) == [1024, 9]
+        assert state.timeouts == 0 and len(state.workers) == 1
+    finally:
+        for worker in state.workers:
+            worker.shutdown()
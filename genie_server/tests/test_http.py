@@ -0,0 +1,68 @@
+"""
+Compression of tools/call responses over streamable HTTP.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from starlette.testclient import TestClient
+
+import server
+from app import mcp
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Accept-Encoding": "gzip"}
+CALL = {
+    "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+    "params": {"name": "generate_lorem_ipsum", "arguments": {"paragraphs": 10, "words_per_paragraph": 200}},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A test client for a fresh app with the given stateless and JSON response settings."""
+    def make(stateless: bool, json_response: bool) -> TestClient:
+        monkeypatch.setattr(mcp.settings, "stateless_http", stateless)
+        monkeypatch.setattr(mcp.settings, "json_response", json_response)
+        # The session manager is built once per app, with the settings above
+        monkeypatch.setattr(mcp, "_session_manager", None)
+        monkeypatch.setattr(server.settings, "MONGO_WARMUP", False)
+        # The Host header must pass the transport's DNS rebinding protection
+        return TestClient(server.create_app(), base_url=f"http://localhost:{mcp.settings.port}")
+    return make
+
+
+def test_stateless_json_tool_results_are_compressed(client):
+    with client(stateless=True, json_response=True) as http:
+        response = http.post("/mcp", json=CALL, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx has already decoded the body
+    assert int(response.headers["content-length"]) < len(response.content) / 2
+    assert json.loads(response.content)["result"]["isError"] is False
+
+
+def test_sse_tool_results_are_not_compressed(client):
+    with client(stateless=True, json_response=False) as http:
+        response = http.post("/mcp", json=CALL, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, "False"),
+    ({"HTTP_STATELESS": "true"}, "True"),
+    ({"SERVER_WORKERS": "2"}, "True"),
+    ({"SERVER_WORKERS": "2", "HTTP_JSON_RESPONSE": "false"}, "False"),
+])
+def test_json_responses_default_to_stateless(env, expected):
+    clean = {k: v for k, v in os.environ.items() if not k.startswith(("HTTP_", "SERVER_"))}
+    output = subprocess.run(
+        [sys.executable, "-c", "from app.config import settings; print(settings.HTTP_JSON_RESPONSE)"],
+        env={**clean, **env}, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split() == [expected]
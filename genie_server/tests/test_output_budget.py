@@ -0,0 +1,73 @@
+"""
+Output-size budgets applied to tools/call results.
+"""
+import asyncio
+import logging
+from typing import List, TypedDict
+
+import pytest
+from mcp import types
+from mcp.server.fastmcp.tools import Tool
+
+from app import mcp
+from app.tools import utilities, web  # noqa: F401
+
+logging.disable(logging.CRITICAL)
+
+
+def call(name: str, arguments: dict) -> types.CallToolResult:
+    """Run a tools/call request through the MCP request handler, output validation included."""
+    handler = mcp._mcp_server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments))
+    return asyncio.run(handler(request)).root
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """Set a tool's output budget for one test."""
+    def set_budget(name: str, max_bytes: int) -> None:
+        monkeypatch.setitem(mcp._output_budgets, name, max_bytes)
+    return set_budget
+
+
+def test_truncated_dict_str_result_passes_output_validation(budget):
+    budget("slugify", 2000)
+    result = call("slugify", {"text": "word " * 1000})
+    assert not result.isError
+    assert result.meta["truncated"] is True
+    assert result.meta["truncation"]["original"]["returned"] < 5000
+    assert set(result.structuredContent["result"]) == {"original", "slug", "separator", "length"}
+
+
+def test_untruncatable_result_becomes_error(budget):
+    budget("encode_base64", 2000)
+    result = call("encode_base64", {"text": "x" * 5000})
+    assert not result.isError
+    assert "smaller input" in result.structuredContent["result"]["error"]
+
+
+def test_result_within_budget_is_unchanged(budget):
+    budget("encode_base64", 2000)
+    result = call("encode_base64", {"text": "hello"})
+    assert result.meta is None
+    assert result.structuredContent["result"]["result"] == "aGVsbG8="
+
+
+def test_tool_field_named_truncated_is_kept(budget, monkeypatch):
+    class Rows(TypedDict):
+        rows: List[str]
+        count: int
+        truncated: bool
+    
+    def rows_tool() -> Rows:
+        rows = ["row"] * 1000
+        return {"rows": rows, "count": len(rows), "truncated": False}
+    
+    monkeypatch.setitem(mcp._tool_manager._tools, "rows_tool", Tool.from_function(rows_tool))
+    budget("rows_tool", 2000)
+    result = call("rows_tool", {})
+    assert not result.isError
+    assert result.structuredContent["truncated"] is True
+    assert result.structuredContent["count"] == 1000
+    assert "truncation" not in result.structuredContent
+    assert result.meta["truncation"]["rows"] == {"total": 1000, "returned": len(result.structuredContent["rows"])}
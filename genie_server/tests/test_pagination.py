@@ -0,0 +1,152 @@
+"""
+Keyset filters in app.database.pagination.
+"""
+from functools import cmp_to_key
+
+import pytest
+
+from app.database.pagination import _TYPE_ORDER, _type_rank, keyset_filter, normalize_sort, sort_values
+
+ALL_TYPES = [alias for _, aliases in _TYPE_ORDER for alias in aliases]
+
+
+def types_after(alias):
+    """$type aliases MongoDB sorts after the type of alias."""
+    return ALL_TYPES[ALL_TYPES.index(alias) + 1:]
+
+
+def lookup(doc, field):
+    value = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def matches(doc, query):
+    """Evaluate the subset of MongoDB query syntax keyset_filter() produces."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = lookup(doc, key)
+        if not isinstance(condition, dict):
+            if value != condition or isinstance(value, bool) != isinstance(condition, bool):
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$exists":
+                ok = (key in doc) == operand
+            elif op == "$type":
+                ok = any(alias in operand for alias in _TYPE_ORDER[_type_rank(key, value)][1])
+            else:
+                same_type = value is not None and _type_rank(key, value) == _type_rank(key, operand)
+                ok = same_type and (value > operand if op == "$gt" else value < operand)
+            if not ok:
+                return False
+    return True
+
+
+def mongo_order(sort):
+    """Sort key placing documents the way MongoDB sorts them."""
+    def compare(a, b):
+        for field, direction in sort:
+            va, vb = lookup(a, field), lookup(b, field)
+            ka = (_type_rank(field, va), 0 if va is None else va)
+            kb = (_type_rank(field, vb), 0 if vb is None else vb)
+            if ka != kb:
+                return direction if ka > kb else -direction
+        return 0
+    return cmp_to_key(compare)
+
+
+def walk(docs, sort, page_size=3):
+    """Page through docs with keyset filters, returning the _ids in the order seen."""
+    ordered = sorted(docs, key=mongo_order(sort))
+    seen, values = [], None
+    while True:
+        query = keyset_filter(sort, values) if values is not None else {}
+        page = [doc for doc in ordered if matches(doc, query)][:page_size]
+        if not page:
+            return seen
+        seen.extend(doc["_id"] for doc in page)
+        values = sort_values(page[-1], sort)
+
+
+MIXED = [
+    {"_id": 1, "a": 3}, {"_id": 2, "a": None}, {"_id": 3}, {"_id": 4, "a": "x"},
+    {"_id": 5, "a": 2.5}, {"_id": 6, "a": True}, {"_id": 7, "a": False}, {"_id": 8, "a": "b"},
+    {"_id": 9}, {"_id": 10, "a": 3}, {"_id": 11, "a": None}, {"_id": 12, "a": -1},
+]
+
+
+def test_missing_field_sorts_as_null():
+    assert sort_values({"_id": 1}, normalize_sort({"a": 1, "b.c": -1})) == [None, None, 1]
+    assert sort_values({"_id": 1, "b": "flat"}, [("b.c", 1)]) == [None]
+
+
+def test_null_token_ascending_moves_on_to_other_types():
+    assert keyset_filter([("a", 1), ("_id", 1)], [None, 5]) == {"$or": [
+        {"a": {"$type": types_after("null")}},
+        {"a": None, "$or": [{"_id": {"$gt": 5}}, {"_id": {"$type": types_after("number")}}]},
+    ]}
+
+
+def test_null_token_descending_only_continues_within_nulls():
+    assert keyset_filter([("a", -1), ("_id", 1)], [None, 5]) == {
+        "a": None, "$or": [{"_id": {"$gt": 5}}, {"_id": {"$type": types_after("number")}}],
+    }
+    # Nothing sorts after the last null
+    assert keyset_filter([("a", -1)], [None]) == {"_id": {"$exists": False}}
+
+
+def test_descending_value_includes_earlier_types_and_nulls():
+    assert keyset_filter([("a", -1)], ["x"]) == {"$or": [
+        {"a": {"$lt": "x"}}, {"a": {"$type": ["number"]}}, {"a": None},
+    ]}
+
+
+def test_mixed_types_ascending():
+    assert keyset_filter([("a", 1)], [5]) == {"$or": [
+        {"a": {"$gt": 5}}, {"a": {"$type": types_after("number")}},
+    ]}
+
+
+def test_bool_sorts_after_numbers():
+    assert _type_rank("a", True) > _type_rank("a", 10 ** 9) > _type_rank("a", None)
+    assert "bool" in keyset_filter([("a", 1)], [3.5])["$or"][1]["a"]["$type"]
+    assert keyset_filter([("a", 1)], [True]) == {"$or": [
+        {"a": {"$gt": True}}, {"a": {"$type": types_after("bool")}},
+    ]}
+    assert "number" in keyset_filter([("a", -1)], [False])["$or"][1]["a"]["$type"]
+
+
+def test_array_values_are_rejected():
+    with pytest.raises(ValueError, match="'tags'.*array"):
+        sort_values({"_id": 1, "tags": [1, 2]}, normalize_sort({"tags": 1}))
+    with pytest.raises(ValueError, match="array"):
+        keyset_filter([("tags", 1)], [[1, 2]])
+
+
+def test_null_in_the_middle_of_a_multi_field_sort():
+    sort = [("a", 1), ("b", -1), ("_id", 1)]
+    assert keyset_filter(sort, [1, None, 7]) == {"$or": [
+        {"$or": [{"a": {"$gt": 1}}, {"a": {"$type": types_after("number")}}]},
+        {"a": 1, "b": None, "$or": [{"_id": {"$gt": 7}}, {"_id": {"$type": types_after("number")}}]},
+    ]}
+
+
+@pytest.mark.parametrize("sort", [{"a": 1}, {"a": -1}, {"a": 1, "_id": -1}, {"a": -1, "_id": -1}])
+def test_walk_visits_every_document_once_in_order(sort):
+    spec = normalize_sort(sort)
+    expected = [doc["_id"] for doc in sorted(MIXED, key=mongo_order(spec))]
+    for page_size in (1, 2, 5):
+        assert walk(MIXED, spec, page_size) == expected
+
+
+@pytest.mark.parametrize("sort", [{"a": 1, "b": -1}, {"a": -1, "b": 1}])
+def test_walk_with_nulls_in_the_middle_field(sort):
+    docs = [{"_id": i, "a": i % 2, **({"b": i % 3} if i % 4 else {})} for i in range(1, 17)]
+    docs += [{"_id": 20, "a": 1, "b": None}, {"_id": 21, "a": None, "b": "z"}]
+    spec = normalize_sort(sort)
+    assert walk(docs, spec, 2) == [doc["_id"] for doc in sorted(docs, key=mongo_order(spec))]
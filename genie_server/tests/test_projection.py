@@ -0,0 +1,103 @@
+"""
+Projections for paged reads in app.tools.data.
+"""
+import logging
+
+import pytest
+
+from app.tools.data import _build_projection, _keep_fields, _strip_fields
+
+logging.disable(logging.CRITICAL)
+
+DOC = {"_id": 7, "name": "ann", "profile": {"age": 31, "city": "Oslo"}, "tags": ["a"]}
+
+
+def project(doc, projection):
+    """Apply a MongoDB projection of top-level and dotted fields to a document."""
+    if not projection:
+        return dict(doc)
+    if any(projection.values()):
+        fields = [field for field, value in projection.items() if value]
+        if projection.get("_id", 1):
+            fields.append("_id")
+        return _keep_fields(doc, fields)
+    return _strip_fields(doc, list(projection))
+
+
+def returned(doc, fields, exclude_fields, sort):
+    """The document as a paged read returns it, and the sort fields available for the page token."""
+    projection, strip, keep = _build_projection(fields, exclude_fields, sort)
+    fetched = project(doc, projection)
+    result = _keep_fields(fetched, keep) if keep is not None else _strip_fields(fetched, strip)
+    return result, fetched
+
+
+def test_sort_on_parent_of_requested_field():
+    sort = [("profile", 1), ("_id", 1)]
+    projection, strip, keep = _build_projection(["profile.age"], [], sort)
+    # MongoDB rejects "profile" together with "profile.age"
+    assert projection == {"profile": 1}
+    assert keep == ["profile.age", "_id"]
+    result, fetched = returned(DOC, ["profile.age"], [], sort)
+    assert fetched["profile"] == DOC["profile"]
+    assert result == {"_id": 7, "profile": {"age": 31}}
+
+
+def test_sort_inside_excluded_field():
+    sort = [("profile.age", 1), ("_id", 1)]
+    projection, strip, keep = _build_projection([], ["profile", "tags"], sort)
+    assert projection == {"tags": 0}
+    assert strip == ["profile"] and keep is None
+    result, fetched = returned(DOC, [], ["profile", "tags"], sort)
+    assert fetched["profile"]["age"] == 31
+    assert result == {"_id": 7, "name": "ann"}
+
+
+def test_sort_on_excluded_field_itself():
+    projection, strip, _ = _build_projection([], ["name"], [("name", -1), ("_id", 1)])
+    assert projection is None and strip == ["name"]
+
+
+def test_id_excluded_with_fields():
+    sort = [("_id", 1)]
+    projection, _, keep = _build_projection(["name"], ["_id"], sort)
+    # _id is still fetched for the page token, then dropped
+    assert projection == {"name": 1, "_id": 1}
+    assert keep == ["name"]
+    assert returned(DOC, ["name"], ["_id"], sort)[0] == {"name": "ann"}
+
+
+def test_id_excluded_with_fields_and_another_sort_field():
+    sort = [("profile.city", 1), ("_id", 1)]
+    result, fetched = returned(DOC, ["name"], ["_id"], sort)
+    assert fetched == {"_id": 7, "name": "ann", "profile": {"city": "Oslo"}}
+    assert result == {"name": "ann"}
+
+
+def test_requested_fields_covering_the_sort_need_no_trimming():
+    assert _build_projection(["name", "profile"], [], [("profile.age", 1), ("_id", 1)]) == (
+        {"name": 1, "profile": 1}, [], None,
+    )
+
+
+def test_other_fields_cannot_be_excluded_alongside_fields():
+    with pytest.raises(ValueError, match="only '_id'"):
+        _build_projection(["name"], ["profile"], [("_id", 1)])
+
+
+def test_keep_fields_follows_arrays_of_subdocuments():
+    doc = {
+        "_id": 1,
+        "items": [{"sku": "a", "qty": 2, "meta": {"w": 1, "h": 2}}, {"sku": "b"}, 5, "x"],
+        "other": 1,
+    }
+    assert _keep_fields(doc, ["items.sku", "items.meta.w", "_id"]) == {
+        "_id": 1,
+        "items": [{"sku": "a", "meta": {"w": 1}}, {"sku": "b"}],
+    }
+
+
+def test_keep_fields_whole_field_wins_over_a_path_inside_it():
+    doc = {"profile": {"age": 31, "city": "Oslo"}, "x": 1}
+    assert _keep_fields(doc, ["profile", "profile.age"]) == {"profile": {"age": 31, "city": "Oslo"}}
+    assert _keep_fields(doc, ["missing.path", "x.y"]) == {}
@@ -0,0 +1,28 @@
+"""
+Chunked scanning in app.utils.streaming.
+"""
+import re
+
+from app.utils.streaming import regex_scanner, scan_chunks
+
+
+def spans(chunks, pattern, overlap):
+    """(start, end) of each match scan_chunks() finds in chunks."""
+    return [(start, end) for start, end, _ in scan_chunks(chunks, regex_scanner(re.compile(pattern)), overlap)]
+
+
+def full_spans(text, pattern):
+    """(start, end) of each match in the whole text."""
+    return [match.span() for match in re.finditer(pattern, text)]
+
+
+def test_chunked_scan_matches_full_scan():
+    text = "alpha beta@example.com gamma " * 200
+    chunks = [text[i:i + 37] for i in range(0, len(text), 37)]
+    assert spans(chunks, r"\S+", 64) == full_spans(text, r"\S+")
+
+
+def test_no_duplicate_after_match_longer_than_overlap():
+    text = "x" * 10 + "a" * 30 + "b" + "xxxx"
+    chunks = [text[:45], "y" * 20]
+    assert spans(chunks, r"a+|b", 8) == full_spans(text + "y" * 20, r"a+|b") == [(10, 40), (40, 41)]
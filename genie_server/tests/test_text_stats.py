@@ -0,0 +1,67 @@
+"""
+Streaming text statistics in app.utils.text_stats.
+"""
+import random
+
+import pytest
+
+from app.utils import text_stats
+from app.utils.text_stats import TextStats
+from benchmarks.bench_word_count import legacy_word_count
+
+# Runs the text is built from: words, whitespace of every kind str.split()
+# knows, sentence ends and paragraph breaks
+RUNS = ["ab", "word", "x" * 40, " ", "   ", "\t", "　", "\x0b", "\xa0", "\n", "\n\n", "\n\n\n", " \n \n",
+        ".", "!?", "...", "?!.", "é", "a.b"]
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(RUNS) * rng.choice((1, 1, 2, 9)) for _ in range(rng.randint(0, 30)))
+
+
+def random_chunks(rng: random.Random, text: str):
+    """Split text at random points, empty chunks included."""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 8)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def stats(chunks) -> dict:
+    counter = TextStats()
+    for chunk in chunks:
+        counter.feed(chunk)
+    return counter.finish().result()
+
+
+@pytest.fixture(autouse=True)
+def small_pieces(monkeypatch):
+    """Small pieces, so chunks are cut up inside words and whitespace runs too."""
+    monkeypatch.setattr(text_stats, "PIECE_CHARS", 7)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "   \n\n  ",
+    "x" * 100,
+    "a" * 50 + "." * 20 + "b" * 50,
+    "Hello world.  This is   it!\n\nNext paragraph?? Yes...\n\n\n",
+    " " * 30 + "word" + "\n" * 30 + "word" + " " * 30,
+    "!?.!?.!?." * 10,
+])
+def test_matches_previous_word_count(text):
+    assert stats([text]) == legacy_word_count(text)
+    assert stats(list(text)) == legacy_word_count(text)
+
+
+def test_matches_previous_word_count_on_random_chunkings():
+    rng = random.Random(0)
+    for _ in range(3000):
+        text = random_text(rng)
+        assert stats(random_chunks(rng, text)) == legacy_word_count(text), repr(text)
+
+
+def test_no_whitespace_keeps_a_bounded_carry():
+    counter = TextStats()
+    for _ in range(1000):
+        counter.feed("abcdefghij")
+        assert len(counter._carry) <= 1
+    assert counter.finish().result() == legacy_word_count("abcdefghij" * 1000)